@@ -1,33 +1,77 @@
 #!/usr/bin/env python3
 """
 Standalone video captioning script.
-Uses Whisper for transcription and MoviePy for video composition.
+Uses Whisper for transcription and ffmpeg's libass subtitles filter to burn in captions.
 Can be called independently or from main.py.
 """
 import sys
 import os
 import argparse
+import functools
+import gc
 import logging
 import subprocess
+import ssl
+import tempfile
+import traceback
+from typing import List, Optional, Tuple
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# faster-whisper (CTranslate2, int8) is preferred when installed; openai-whisper is the fallback
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    WhisperModel = None
+    FASTER_WHISPER_AVAILABLE = False
+
+WHISPER_MODEL = "base"
+
+# Caption style: white 48px text with a 3px black outline, centred on screen
+CAPTION_FONT_SIZE = 48
+CAPTION_OUTLINE = 3
+CAPTION_WIDTH = 0.80  # Fraction of the frame width text may use before wrapping
+MAX_WORDS_PER_CAPTION = 5
+# Word-timed captions: up to 3 words, flushed early once 2+ words span this many seconds
+MAX_WORDS_PER_WORD_CAPTION = 3
+WORD_CAPTION_MIN_DURATION = 0.6
+
+# Scratch files (Whisper WAV, ASS subtitles) go on tmpfs when available, skipping the block layer
+_SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+_ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: {width}
+PlayResY: {height}
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Caption,Arial,{font_size},&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,{outline},0,5,{margin},{margin},0,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
 def check_dependencies():
     """Check if required dependencies are available."""
     missing = []
     
     # Check ffmpeg
     try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True, timeout=5)
+        subprocess.run(['ffmpeg', '-version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=5)
     except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
         missing.append("ffmpeg")
     
-    # Check whisper
+    # Check whisper (either backend will do)
     try:
-        import whisper
+        if not FASTER_WHISPER_AVAILABLE:
+            import whisper
     except ImportError:
-        missing.append("openai-whisper (pip install openai-whisper)")
+        missing.append("faster-whisper or openai-whisper (pip install faster-whisper)")
     except Exception as e:
         error_msg = str(e).lower()
         if "incompatible architecture" in error_msg or ("dlopen" in error_msg and ("x86_64" in error_msg or "arm64" in error_msg)):
@@ -35,20 +79,214 @@ def check_dependencies():
         else:
             missing.append(f"whisper import error: {e}")
     
-    # Check moviepy
+    return missing
+
+def _load_openai_whisper():
+    """Load the openai-whisper model, downloading it with certifi's CA bundle if needed."""
+    import whisper
+    import certifi
+    
+    # Handle SSL certificate issues on the model download
     try:
-        from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
-    except ImportError:
-        try:
-            from moviepy import VideoFileClip, TextClip, CompositeVideoClip
-        except ImportError:
-            missing.append("moviepy (pip install moviepy)")
+        ssl_context = ssl.create_default_context(cafile=certifi.where())
+    except Exception:
+        ssl_context = ssl._create_unverified_context()
+    original_ssl = ssl._create_default_https_context
+    ssl._create_default_https_context = lambda: ssl_context
+    try:
+        return whisper.load_model(WHISPER_MODEL)
+    finally:
+        ssl._create_default_https_context = original_ssl
+
+def extract_audio(media_path: str, wav_path: str) -> bool:
+    """
+    Extract the audio track as 16 kHz mono WAV (Whisper's native input format).
     
-    return missing
+    Returns:
+        True if the WAV was written
+    """
+    try:
+        subprocess.run(
+            ['ffmpeg', '-i', media_path, '-vn', '-ac', '1', '-ar', '16000', '-f', 'wav', '-y', wav_path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=300, check=True
+        )
+        return True
+    except (subprocess.SubprocessError, OSError):
+        logger.warning("Could not extract audio for Whisper, transcribing the video directly")
+        return False
+
+@functools.lru_cache(maxsize=1)
+def _get_whisper_model():
+    """Load the Whisper model for the available backend once per process."""
+    if FASTER_WHISPER_AVAILABLE:
+        return WhisperModel(WHISPER_MODEL, device="auto", compute_type="int8")
+    return _load_openai_whisper()
+
+def release_whisper_model():
+    """Drop the cached Whisper model and return its memory before the encode step."""
+    _get_whisper_model.cache_clear()
+    gc.collect()
+    torch = sys.modules.get("torch")  # Only openai-whisper loads PyTorch
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+def transcribe_segments(media_path: str, script: str = None) -> List[dict]:
+    """
+    Transcribe English speech into Whisper-style segments.
+    Uses faster-whisper (int8 on CPU) when installed, otherwise openai-whisper.
+    
+    Args:
+        media_path: Audio or video file to transcribe
+        script: Optional script text; its start is used as Whisper's initial prompt
+    
+    Returns:
+        List of {"text", "start", "end", "words"} segments; words are {"word", "start", "end"}
+    """
+    prompt = script[:200] if script else None
+    with tempfile.TemporaryDirectory(dir=_SCRATCH_DIR) as tmp_dir:
+        # Whisper only needs 16 kHz mono PCM - extract it once so the video frames aren't decoded
+        wav_path = os.path.join(tmp_dir, "audio.wav")
+        if extract_audio(media_path, wav_path):
+            media_path = wav_path
+        
+        if FASTER_WHISPER_AVAILABLE:
+            model = _get_whisper_model()
+            segments, _info = model.transcribe(media_path, language="en", initial_prompt=prompt,
+                                               word_timestamps=True)
+            # segments is a lazy generator - consume it while the wav still exists
+            return [{"text": seg.text, "start": seg.start, "end": seg.end,
+                     "words": [{"word": w.word, "start": w.start, "end": w.end} for w in seg.words or ()]}
+                    for seg in segments]
+        
+        model = _get_whisper_model()
+        result = model.transcribe(media_path, language="en", task="transcribe", initial_prompt=prompt,
+                                  word_timestamps=True)
+        return result.get("segments", [])
+
+def split_caption_chunks(segments: List[dict], max_words: int = MAX_WORDS_PER_CAPTION) -> List[Tuple[str, float, float]]:
+    """
+    Split Whisper segments into short captions, spreading each segment's time evenly.
+    
+    Args:
+        segments: Whisper segments with "text", "start" and "end"
+        max_words: Maximum words shown at once
+    
+    Returns:
+        List of (text, start, end) captions
+    """
+    chunks = []
+    for segment in segments:
+        start_time = float(segment["start"])
+        end_time = float(segment["end"])
+        words = segment["text"].split()
+        if not words:
+            continue
+        
+        num_chunks = (len(words) + max_words - 1) // max_words
+        time_per_chunk = (end_time - start_time) / num_chunks
+        for chunk_idx in range(num_chunks):
+            chunk_words = words[chunk_idx * max_words:(chunk_idx + 1) * max_words]
+            chunks.append((" ".join(chunk_words),
+                           start_time + chunk_idx * time_per_chunk,
+                           start_time + (chunk_idx + 1) * time_per_chunk))
+    return chunks
+
+def group_word_captions(segments: List[dict]) -> List[Tuple[str, float, float]]:
+    """
+    Build short word-timed captions (2-3 words) from Whisper word timestamps.
+    Segments without word timings fall back to split_caption_chunks.
+    
+    Args:
+        segments: Whisper segments, optionally with "words"
+    
+    Returns:
+        List of (text, start, end) captions
+    """
+    captions = []
+    for segment in segments:
+        words = [w for w in segment.get("words") or () if w["word"].strip()]
+        if not words:
+            captions.extend(split_caption_chunks([segment]))
+            continue
+        
+        group = []
+        for word in words:
+            group.append(word)
+            span = float(group[-1]["end"]) - float(group[0]["start"])
+            if len(group) >= MAX_WORDS_PER_WORD_CAPTION or (len(group) >= 2 and span >= WORD_CAPTION_MIN_DURATION):
+                captions.append((" ".join(w["word"].strip() for w in group),
+                                 float(group[0]["start"]), float(group[-1]["end"])))
+                group = []
+        if group:
+            captions.append((" ".join(w["word"].strip() for w in group),
+                             float(group[0]["start"]), float(group[-1]["end"])))
+    return captions
+
+def probe_video_size(video_path: str) -> Optional[Tuple[int, int]]:
+    """Return (width, height) of the first video stream, or None if ffprobe can't read it."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=width,height',
+             '-of', 'csv=p=0:s=x', video_path],
+            capture_output=True, text=True, timeout=10, check=True
+        )
+        width, height = result.stdout.strip().split('x')[:2]
+        return int(width), int(height)
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return None
+
+def _ass_time(seconds: float) -> str:
+    """Format seconds as an ASS timestamp (h:mm:ss.cc)."""
+    cs = int(round(max(seconds, 0) * 100))
+    h, cs = divmod(cs, 360000)
+    m, cs = divmod(cs, 6000)
+    s, cs = divmod(cs, 100)
+    return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
+
+def write_ass_subtitles(captions: List[Tuple[str, float, float]], ass_path: str, width: int, height: int):
+    """
+    Write captions as an ASS subtitle file in the caption style, sized to the video.
+    
+    Args:
+        captions: List of (text, start, end)
+        ass_path: Where to write the .ass file
+        width: Video width in pixels
+        height: Video height in pixels
+    """
+    margin = int(width * (1 - CAPTION_WIDTH) / 2)
+    lines = [_ASS_HEADER.format(width=width, height=height, font_size=CAPTION_FONT_SIZE,
+                                outline=CAPTION_OUTLINE, margin=margin)]
+    for text, start, end in captions:
+        if end <= start:
+            continue
+        # Braces open ASS override blocks and backslashes start tags - keep text literal
+        text = text.replace("\\", "/").replace("{", "(").replace("}", ")").replace("\n", " ")
+        lines.append(f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},Caption,,0,0,0,,{text}\n")
+    with open(ass_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+def burn_subtitles(video_path: str, ass_path: str, output_path: str) -> bool:
+    """
+    Burn an ASS subtitle file into the video with ffmpeg/libass (audio is copied).
+    
+    Returns:
+        True if ffmpeg succeeded
+    """
+    # Run from the subtitle's directory so the filter argument needs no path escaping
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', os.path.abspath(video_path), '-vf', f"ass={os.path.basename(ass_path)}",
+         '-c:v', 'libx264', '-preset', 'medium', '-crf', '20', '-c:a', 'copy',
+         '-movflags', '+faststart', '-y', os.path.abspath(output_path)],
+        capture_output=True, text=True, timeout=900, cwd=os.path.dirname(os.path.abspath(ass_path))
+    )
+    if result.returncode != 0:
+        logger.error(f"ffmpeg failed to burn captions: {result.stderr[-500:]}")
+        return False
+    return True
 
 def add_captions_to_video(video_path: str, script: str = None, output_path: str = None):
     """
-    Add captions to video using Whisper timestamps + MoviePy styling.
+    Add captions to video using Whisper timestamps + libass styling.
     
     Args:
         video_path: Path to input video
@@ -69,61 +307,38 @@ def add_captions_to_video(video_path: str, script: str = None, output_path: str
     logger.info(f"Adding captions to: {video_path}")
     logger.info(f"Output will be: {output_path}")
     
-    # Import dependencies
-    try:
-        import whisper
-    except ImportError as e:
-        logger.error(f"Whisper not available: {e}")
-        logger.error("Install with: pip install openai-whisper")
-        return None
-    except Exception as e:
-        error_msg = str(e).lower()
-        if "incompatible architecture" in error_msg or ("dlopen" in error_msg and ("x86_64" in error_msg or "arm64" in error_msg)):
-            logger.error("PyTorch architecture mismatch detected")
-            logger.error("This should have been fixed before calling this script.")
-            logger.error("Manual fix required: pip uninstall torch && pip install torch")
-            return None
-        else:
-            logger.error(f"Whisper import error: {e}")
-            return None
-    
-    try:
+    # Import dependencies (faster-whisper needs no PyTorch)
+    if not FASTER_WHISPER_AVAILABLE:
         try:
-            from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
-        except ImportError:
-            from moviepy import VideoFileClip, TextClip, CompositeVideoClip
-        import ssl
-        import certifi
-    except ImportError as e:
-        logger.error(f"MoviePy not available: {e}")
-        logger.error("Install with: pip install moviepy certifi")
-        return None
+            import whisper
+        except ImportError as e:
+            logger.error(f"Whisper not available: {e}")
+            logger.error("Install with: pip install faster-whisper (or openai-whisper)")
+            return None
+        except Exception as e:
+            error_msg = str(e).lower()
+            if "incompatible architecture" in error_msg or ("dlopen" in error_msg and ("x86_64" in error_msg or "arm64" in error_msg)):
+                logger.error("PyTorch architecture mismatch detected")
+                logger.error("This should have been fixed before calling this script.")
+                logger.error("Manual fix required: pip uninstall torch && pip install torch")
+                return None
+            else:
+                logger.error(f"Whisper import error: {e}")
+                return None
     
     try:
         # Step 1: Extract timestamps with Whisper
-        logger.info("Extracting timestamps with Whisper...")
-        
-        # Handle SSL certificate issues
-        try:
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-        except:
-            ssl_context = ssl._create_unverified_context()
-        
-        import urllib.request
-        original_ssl = ssl._create_default_https_context
-        ssl._create_default_https_context = lambda: ssl_context
+        backend = "faster-whisper" if FASTER_WHISPER_AVAILABLE else "openai-whisper"
+        logger.info(f"Extracting timestamps with Whisper ({backend})...")
         
         try:
-            model = whisper.load_model("base")
+            segments = transcribe_segments(video_path, script)
         except Exception as e:
-            logger.error(f"Failed to load Whisper model: {e}")
+            logger.error(f"Whisper transcription failed: {e}")
             return None
         finally:
-            ssl._create_default_https_context = original_ssl
-        
-        # Transcribe video
-        result = model.transcribe(video_path, language="en", task="transcribe")
-        segments = result.get("segments", [])
+            # One video per run here - free the model so it isn't resident during the ffmpeg encode
+            release_whisper_model()
         
         if not segments:
             logger.warning("No segments found in transcription")
@@ -131,159 +346,29 @@ def add_captions_to_video(video_path: str, script: str = None, output_path: str
         
         logger.info(f"✓ Got {len(segments)} caption segments")
         
-        # Step 2: Load video with MoviePy
-        logger.info("Loading video with MoviePy...")
-        video = VideoFileClip(video_path)
-        video_duration = video.duration
-        video_size = video.size
-        
-        logger.info(f"Video duration: {video_duration:.2f}s, size: {int(video_size[0])}x{int(video_size[1])}")
-        
-        # Step 3: Create text clips (max 5 words per segment)
-        logger.info("Creating styled text clips (max 5 words per segment)...")
-        text_clips = []
-        
-        for i, segment in enumerate(segments):
-            start_time = float(segment["start"])
-            end_time = float(segment["end"])
-            text = segment["text"].strip()
-            
-            if not text:
-                continue
-            
-            # Split text into chunks of max 5 words
-            words = text.split()
-            max_words_per_chunk = 5
-            
-            if len(words) <= max_words_per_chunk:
-                # Single chunk, use original timing
-                chunks = [(text, start_time, end_time)]
-            else:
-                # Split into multiple chunks
-                chunks = []
-                num_chunks = (len(words) + max_words_per_chunk - 1) // max_words_per_chunk
-                time_per_chunk = (end_time - start_time) / num_chunks
-                
-                for chunk_idx in range(num_chunks):
-                    chunk_start_idx = chunk_idx * max_words_per_chunk
-                    chunk_end_idx = min(chunk_start_idx + max_words_per_chunk, len(words))
-                    chunk_words = words[chunk_start_idx:chunk_end_idx]
-                    chunk_text = " ".join(chunk_words)
-                    
-                    chunk_start_time = start_time + (chunk_idx * time_per_chunk)
-                    chunk_end_time = start_time + ((chunk_idx + 1) * time_per_chunk)
-                    
-                    chunks.append((chunk_text, chunk_start_time, chunk_end_time))
-            
-            # Create text clip for each chunk
-            for chunk_text, chunk_start_time, chunk_end_time in chunks:
-                duration = chunk_end_time - chunk_start_time
-                
-                if duration <= 0:
-                    continue
-                
-                # Create text clip with styling - ensure it fits within video bounds
-                # Use method='caption' with explicit height constraint to prevent cutoff
-                text_width = int(video_size[0] * 0.80)  # 80% width to leave safe margins
-                max_text_height = int(video_size[1] * 0.25)  # Max 25% of video height for text
-                
-                try:
-                    # Use method='caption' with explicit size to prevent text from being cut off
-                    txt_clip = TextClip(
-                        text=chunk_text,
-                        font_size=48,
-                        color='white',
-                        stroke_color='black',
-                        stroke_width=3,
-                        method='caption',
-                        size=(text_width, max_text_height),  # Constrain both width AND height
-                        text_align='center'
-                    )
-                except (TypeError, ValueError):
-                    try:
-                        # Fallback without method='caption'
-                        txt_clip = TextClip(
-                            text=chunk_text,
-                            font_size=48,
-                            color='white',
-                            stroke_color='black',
-                            stroke_width=3,
-                            size=(text_width, max_text_height),
-                            text_align='center'
-                        )
-                    except (TypeError, ValueError):
-                        # Final fallback - basic text clip
-                        txt_clip = TextClip(
-                            text=chunk_text,
-                            font_size=48,
-                            color='white',
-                            size=(text_width, max_text_height)
-                        )
-
-                # Add padding so the stroke doesn't get clipped by the text clip's bounding box
-                # (This is a common cause of "sliced" text in MoviePy TextClip)
-                try:
-                    txt_clip = txt_clip.with_margin(left=12, right=12, top=10, bottom=10, opacity=0)
-                except Exception:
-                    try:
-                        txt_clip = txt_clip.margin(left=12, right=12, top=10, bottom=10, opacity=0)
-                    except Exception:
-                        pass
-                
-                # Position centered vertically and horizontally
-                # MoviePy's 'center' positioning ensures text stays within bounds
-                try:
-                    txt_clip = txt_clip.with_position(('center', 'center')) \
-                                       .with_start(chunk_start_time) \
-                                       .with_duration(duration)
-                except AttributeError:
-                    txt_clip = txt_clip.set_position(('center', 'center')) \
-                                       .set_start(chunk_start_time) \
-                                       .set_duration(duration)
-                
-                text_clips.append(txt_clip)
-            
-            if (i + 1) % 5 == 0:
-                logger.info(f"  Processed {i + 1}/{len(segments)} segments, created {len(text_clips)} text clips...")
+        # Step 2: Write the captions as an ASS subtitle file sized to the video
+        size = probe_video_size(video_path)
+        if not size:
+            logger.error("Could not read video dimensions")
+            return None
+        logger.info(f"Video size: {size[0]}x{size[1]}")
         
-        logger.info(f"✓ Created {len(text_clips)} text clips")
+        captions = group_word_captions(segments)
+        logger.info(f"✓ Created {len(captions)} word-timed captions")
         
-        # Step 4: Composite video with captions
-        logger.info("Compositing video with captions...")
-        try:
-            final_video = CompositeVideoClip([video] + text_clips)
-        except AttributeError:
-            final_video = CompositeVideoClip([video] + text_clips)
-        
-        # Step 5: Render video
+        # Step 3: Burn in with libass in a single ffmpeg encode
         logger.info("Rendering captioned video (this may take a minute)...")
-        try:
-            final_video.write_videofile(
-                output_path,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
-        except Exception as e:
-            logger.error(f"Failed to render video: {e}")
-            return None
-        
-        # Cleanup
-        video.close()
-        final_video.close()
-        for clip in text_clips:
-            try:
-                clip.close()
-            except:
-                pass
+        with tempfile.TemporaryDirectory(dir=_SCRATCH_DIR) as tmp_dir:
+            ass_path = os.path.join(tmp_dir, "captions.ass")
+            write_ass_subtitles(captions, ass_path, *size)
+            if not burn_subtitles(video_path, ass_path, output_path):
+                return None
         
         logger.info(f"✓ Captioned video saved: {output_path}")
         return output_path
         
     except Exception as e:
         logger.error(f"Error during captioning: {e}")
-        import traceback
         logger.debug(traceback.format_exc())
         return None
 
@@ -292,10 +377,12 @@ def main():
     parser = argparse.ArgumentParser(description="Add captions to video using Whisper")
     parser.add_argument("video_path", help="Path to input video file")
     parser.add_argument("-o", "--output", help="Output path (default: input_captioned.mp4)")
-    parser.add_argument("-s", "--script", help="Optional script text to help Whisper")
+    parser.add_argument("-s", "--script", help="Optional script text to help Whisper ('-' reads it from stdin)")
     parser.add_argument("--check-deps", action="store_true", help="Check dependencies and exit")
     
     args = parser.parse_args()
+    if args.script == "-":
+        args.script = sys.stdin.read()
     
     if args.check_deps:
         missing = check_dependencies()
@@ -325,7 +412,6 @@ def main():
             sys.exit(1)
     except Exception as e:
         logger.error(f"FAILED: Exception during captioning: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         sys.exit(1)
 
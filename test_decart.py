@@ -23,6 +23,9 @@ HEYGEN_HEADERS = {
 # Output directory
 GENERATED_VIDEOS_DIR = "generated_videos"
 
+# Read size for streamed downloads (1MB)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 # Import ContentOptimizer for metadata generation
 try:
     from content_optimizer import ContentOptimizer
@@ -30,6 +33,9 @@ except ImportError:
     print("Warning: content_optimizer not found. Metadata generation will be simplified.")
     ContentOptimizer = None
 
+# Lazily-created ContentOptimizer shared across generate_metadata calls
+_OPTIMIZER = None
+
 
 def ensure_output_directory():
     """Ensure the generated_videos directory exists."""
@@ -49,13 +55,15 @@ def generate_metadata(video_description: str, keywords: list = None) -> Dict:
     Returns:
         Dictionary with title, description, hashtags, and tags
     """
+    global _OPTIMIZER
     if ContentOptimizer:
-        optimizer = ContentOptimizer()
+        if _OPTIMIZER is None:
+            _OPTIMIZER = ContentOptimizer()
         trend_data = {
             "title": video_description,
             "keywords": keywords or []
         }
-        metadata = optimizer.optimize_metadata(trend_data)
+        metadata = _OPTIMIZER.optimize_metadata(trend_data)
         return metadata
     else:
         # Fallback simple metadata generation
@@ -200,13 +208,13 @@ def create_heygen_video(script: str, avatar_id: str = None, voice_id: str = None
             return None
         elif response.status_code == 400:
             print(f"✗ Bad request (400)")
-            print(f"   Response: {response.text[:500]}")
+            print(f"   Response: {response.content[:500].decode('utf-8', 'replace')}")
             print(f"   This usually means required parameters are missing")
             print(f"   Required: avatar_id, voice_id, script")
             return None
         else:
             print(f"✗ Failed to create video. Status: {response.status_code}")
-            print(f"Response: {response.text[:500]}")
+            print(f"Response: {response.content[:500].decode('utf-8', 'replace')}")
             return None
             
     except requests.exceptions.ConnectionError as e:
@@ -235,12 +243,12 @@ def check_video_status(video_id: str, max_wait_time: int = 600, poll_interval: i
     # Use v1 API endpoint for status check (HeyGen uses v1 for status)
     status_url = f"https://api.heygen.com/v1/video_status.get"
     
-    start_time = time.time()
+    start_time = time.monotonic()
     
     print(f"\n⏳ Waiting for video to be ready...")
     print(f"   Video ID: {video_id}")
     
-    while time.time() - start_time < max_wait_time:
+    while time.monotonic() - start_time < max_wait_time:
         try:
             params = {"video_id": video_id}
             response = requests.get(status_url, params=params, headers=HEYGEN_HEADERS, timeout=30)
@@ -304,13 +312,28 @@ def download_video(video_url: str, output_path: str) -> bool:
         downloaded = 0
         
         with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size > 0:
-                        percent = (downloaded / total_size) * 100
-                        print(f"\r   Progress: {percent:.1f}% ({downloaded}/{total_size} bytes)", end='')
+            # Reserve the full file size upfront so the filesystem can lay it out contiguously
+            if total_size > 0 and hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, total_size)
+                except OSError:
+                    pass
+
+            # Read straight from the raw urllib3 stream in 1MB blocks instead of
+            # iterating small chunks through iter_content
+            response.raw.decode_content = True
+            while True:
+                chunk = response.raw.read(DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                downloaded += len(chunk)
+                if total_size > 0:
+                    percent = (downloaded / total_size) * 100
+                    print(f"\r   Progress: {percent:.1f}% ({downloaded}/{total_size} bytes)", end='')
+
+            # Drop any preallocated tail if the decoded body was shorter than content-length
+            f.truncate()
         
         print()  # New line after progress
         file_size = os.path.getsize(output_path)
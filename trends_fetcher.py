@@ -8,7 +8,11 @@ import time
 import random
 import os
 import json
-from datetime import datetime, timedelta
+import hashlib
+import re
+from collections import Counter
+from itertools import chain
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
 from googleapiclient.errors import HttpError
 from config import MAX_RETRIES, RETRIABLE_STATUS_CODES
@@ -16,9 +20,75 @@ from config import MAX_RETRIES, RETRIABLE_STATUS_CODES
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# orjson is optional; fall back to the stdlib json module when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # File to track used topics
 USED_TOPICS_FILE = "used_topics.json"
 
+# Upper bounds for retry sleeps (seconds)
+MAX_BACKOFF_SECONDS = 60
+MAX_BACKOFF_JITTER = 10
+
+# How long fetched trending videos are reused before hitting the API again (seconds)
+TRENDING_CACHE_TTL = 120
+
+# YouTube "Gaming" video category
+GAMING_CATEGORY_ID = "20"
+
+# Partial-response masks: only request the fields we actually read
+SEARCH_FIELDS = "items(id/videoId)"
+VIDEO_FIELDS = "items(id,snippet(title,description,channelTitle,channelId,publishedAt,tags),statistics(viewCount,likeCount))"
+
+# Common words to ignore when extracting keywords
+_STOP_WORDS = frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "this", "that", "video", "watch", "youtube"})
+
+# Punctuation stripped from words before counting them
+_PUNCT_TABLE = str.maketrans({c: ' ' for c in ".,!?;:()[]{}'\""})
+
+# How much of a video description is scanned for Roblox keywords
+DESCRIPTION_SCAN_CHARS = 200
+
+# Keywords that mark a video as Roblox-related
+_ROBLOX_KEYWORDS = ("roblox", "blox", "rblx", "obbie", "obby")
+
+# Matches any Roblox-related keyword in a title, description, or tag list
+_ROBLOX_RE = re.compile("|".join(_ROBLOX_KEYWORDS), re.IGNORECASE)
+
+
+def _backoff_delay(retry: int) -> float:
+    """Exponential backoff capped at MAX_BACKOFF_SECONDS, plus a bounded random jitter."""
+    return min(MAX_BACKOFF_SECONDS, 2 ** retry) + random.random() * min(MAX_BACKOFF_JITTER, 2 ** retry)
+
+
+def _is_roblox_video(title: str, tags: List[str], description: str) -> bool:
+    """
+    Check whether a video looks Roblox-related.
+    
+    Creators put the topic in the title/tags, so only the start of the
+    (possibly multi-KB) description is scanned.
+    """
+    # Cheapest field first; tags are only joined if the title didn't match
+    if _ROBLOX_RE.search(title):
+        return True
+    if tags and _ROBLOX_RE.search(" ".join(tags)):
+        return True
+    return bool(_ROBLOX_RE.search(description, 0, DESCRIPTION_SCAN_CHARS))
+
+
+def _parse_yt_ts(s: str) -> datetime:
+    """
+    Parse a YouTube API timestamp (YYYY-MM-DDTHH:MM:SSZ) into a naive UTC datetime.
+    
+    Slices the fixed-width fields directly instead of going through fromisoformat.
+    Raises ValueError if the string is not in the expected shape.
+    """
+    return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                    int(s[11:13]), int(s[14:16]), int(s[17:19]))
+
 
 class TrendsFetcher:
     """Fetches and analyzes YouTube trending videos."""
@@ -33,6 +103,12 @@ class TrendsFetcher:
         self.youtube_service = youtube_service
         if not self.youtube_service:
             raise ValueError("YouTube service is required")
+        # In-memory copy of used_topics.json, reloaded whenever the file's mtime changes
+        # (RedditFetcher writes the same file)
+        self._used_topics_cache: Optional[set] = None
+        self._used_topics_mtime: Optional[int] = None
+        # (region, roblox_only, max_results) -> (fetched_at, videos)
+        self._trending_cache: Dict[tuple, tuple] = {}
     
     def fetch_trending_videos(self, region: str = "US", max_results: int = 10, roblox_only: bool = True) -> List[Dict]:
         """
@@ -47,6 +123,13 @@ class TrendsFetcher:
         Returns:
             List of trending video dictionaries with title, description, etc.
         """
+        # Trending data is stable on a minutes scale, so reuse a recent fetch
+        cache_key = (region, roblox_only, max_results)
+        entry = self._trending_cache.get(cache_key)
+        if entry and time.monotonic() - entry[0] < TRENDING_CACHE_TTL:
+            logger.info("Using cached trending videos")
+            return list(entry[1])
+        
         videos = []
         retry = 0
         
@@ -57,7 +140,36 @@ class TrendsFetcher:
                 else:
                     logger.info(f"Fetching trending videos (attempt {retry + 1})...")
                 
+                response = None
                 if roblox_only:
+                    # The Gaming chart is a single videos.list call (1 quota unit); only fall back to
+                    # search.list (100 units plus a second round trip) if it lacks enough Roblox videos
+                    try:
+                        chart_response = self.youtube_service.videos().list(
+                            part="snippet,statistics",
+                            chart="mostPopular",
+                            regionCode=region,
+                            videoCategoryId=GAMING_CATEGORY_ID,
+                            maxResults=50,  # YouTube API max is 50
+                            fields=VIDEO_FIELDS
+                        ).execute()
+                    except HttpError as e:
+                        # e.g. no Gaming chart for this region - the search below still works
+                        logger.info(f"Gaming chart unavailable ({e.resp.status}), falling back to search")
+                        chart_response = None
+                    if chart_response is not None:
+                        roblox_count = sum(
+                            1 for item in chart_response.get("items", [])
+                            if _is_roblox_video((snippet := item["snippet"]).get("title", ""),
+                                                snippet.get("tags", []),
+                                                snippet.get("description", ""))
+                        )
+                        if roblox_count >= max_results:
+                            response = chart_response
+                        else:
+                            logger.info(f"Gaming chart has {roblox_count} Roblox videos, falling back to search")
+                
+                if roblox_only and response is None:
                     # Search for Roblox-related trending content
                     # Use search API with Roblox keywords and sort by viewCount
                     search_request = self.youtube_service.search().list(
@@ -67,7 +179,8 @@ class TrendsFetcher:
                         order="viewCount",
                         publishedAfter=(datetime.now() - timedelta(days=7)).isoformat() + "Z",  # Last 7 days
                         maxResults=min(max_results * 2, 50),  # Get more to filter
-                        regionCode=region
+                        regionCode=region,
+                        fields=SEARCH_FIELDS
                     )
                     search_response = search_request.execute()
                     
@@ -82,88 +195,81 @@ class TrendsFetcher:
                     request = self.youtube_service.videos().list(
                         part="snippet,statistics",
                         id=",".join(video_ids[:max_results]),
-                        maxResults=min(len(video_ids), max_results)
+                        maxResults=min(len(video_ids), max_results),
+                        fields=VIDEO_FIELDS
                     )
-                else:
+                elif not roblox_only:
                     # Original behavior: fetch general trending videos
                     request = self.youtube_service.videos().list(
                         part="snippet,statistics",
                         chart="mostPopular",
                         regionCode=region,
-                        maxResults=min(max_results, 50)  # YouTube API max is 50
+                        maxResults=min(max_results, 50),  # YouTube API max is 50
+                        fields=VIDEO_FIELDS
                     )
                 
-                response = request.execute()
+                if response is None:
+                    response = request.execute()
                 
                 if "items" in response:
-                    current_date = datetime.now()
-                    # Prioritize videos from the last 7 days for Roblox content (very recent trending)
-                    recent_cutoff = current_date - timedelta(days=7)
+                    # Prioritize videos from the last 7 days for Roblox content (very recent trending).
+                    # YouTube timestamps are fixed-width UTC ISO 8601 (2025-01-15T10:30:00Z), so
+                    # comparing them as strings is the same as comparing them chronologically.
+                    recent_cutoff_str = (datetime.now(timezone.utc) - timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%SZ')
                     
-                    recent_videos = []
-                    older_videos = []
+                    all_videos = []
+                    recent_count = 0
                     
                     for item in response["items"]:
-                        published_at_str = item["snippet"].get("publishedAt", "")
+                        snippet = item["snippet"]
+                        stats = item["statistics"]
+                        published_at_str = snippet.get("publishedAt", "")
                         video_data = {
                             "id": item["id"],
                             "video_id": item["id"],
-                            "title": item["snippet"].get("title", ""),
-                            "description": item["snippet"].get("description", ""),
-                            "channel_name": item["snippet"].get("channelTitle", ""),
-                            "channel_id": item["snippet"].get("channelId", ""),
+                            "title": snippet.get("title", ""),
+                            "description": snippet.get("description", ""),
+                            "channel_name": snippet.get("channelTitle", ""),
+                            "channel_id": snippet.get("channelId", ""),
                             "published_at": published_at_str,
-                            "view_count": item["statistics"].get("viewCount", "0"),
-                            "like_count": item["statistics"].get("likeCount", "0"),
-                            "tags": item["snippet"].get("tags", [])
+                            "view_count": stats.get("viewCount", "0"),
+                            "like_count": stats.get("likeCount", "0"),
+                            "tags": snippet.get("tags", [])
                         }
                         
-                        # Parse publish date to check if recent
-                        try:
-                            if published_at_str:
-                                # YouTube API returns ISO 8601 format: 2025-01-15T10:30:00Z
-                                published_date = datetime.fromisoformat(published_at_str.replace('Z', '+00:00'))
-                                if published_date.replace(tzinfo=None) >= recent_cutoff:
-                                    recent_videos.append(video_data)
-                                else:
-                                    older_videos.append(video_data)
-                            else:
-                                # If no date, treat as older
-                                older_videos.append(video_data)
-                        except Exception:
-                            # If date parsing fails, add to older (safer)
-                            older_videos.append(video_data)
+                        all_videos.append(video_data)
+                        # Videos with no date ("") compare below the cutoff and are treated as older
+                        if published_at_str >= recent_cutoff_str:
+                            recent_count += 1
+                    
+                    # Recent videos first; the sort is stable so API order is kept within each group
+                    all_videos.sort(key=lambda v: v["published_at"] < recent_cutoff_str)
                     
                     # Filter for Roblox-related content if roblox_only is True
                     if roblox_only:
                         roblox_videos = []
-                        for video in recent_videos + older_videos:
-                            title_lower = video.get("title", "").lower()
-                            desc_lower = video.get("description", "").lower()
-                            tags_lower = " ".join(video.get("tags", [])).lower()
-                            
+                        for video in all_videos:
                             # Check if video is Roblox-related
-                            roblox_keywords = ["roblox", "blox", "rblx", "obbie", "obby"]
-                            if any(keyword in title_lower or keyword in desc_lower or keyword in tags_lower 
-                                   for keyword in roblox_keywords):
+                            if _is_roblox_video(video["title"], video["tags"], video["description"]):
                                 roblox_videos.append(video)
                         
                         videos = roblox_videos
                         if roblox_videos:
                             logger.info(f"Found {len(roblox_videos)} Roblox-related trending videos")
                     else:
-                        # Prioritize recent videos, then add older ones
-                        videos = recent_videos + older_videos
-                        if recent_videos:
-                            logger.info(f"Found {len(recent_videos)} recent trending videos (last 7 days)")
+                        videos = all_videos
+                        if recent_count:
+                            logger.info(f"Found {recent_count} recent trending videos (last 7 days)")
                 
                 logger.info(f"Successfully fetched {len(videos)} trending videos")
-                return videos[:max_results]
+                videos = videos[:max_results]
+                self._trending_cache[cache_key] = (time.monotonic(), videos)
+                return list(videos)
                 
             except HttpError as e:
                 if e.resp.status in RETRIABLE_STATUS_CODES:
                     retry += 1
-                    wait_time = (2 ** retry) + random.random()
+                    wait_time = _backoff_delay(retry)
                     logger.warning(f"Retriable HTTP error {e.resp.status}, retrying in {wait_time:.2f}s...")
                     time.sleep(wait_time)
                 else:
@@ -171,7 +277,7 @@ class TrendsFetcher:
                     raise
             except Exception as e:
                 retry += 1
-                wait_time = (2 ** retry) + random.random()
+                wait_time = _backoff_delay(retry)
                 logger.warning(f"Error fetching trends, retrying in {wait_time:.2f}s...")
                 if retry >= MAX_RETRIES:
                     logger.error(f"Failed to fetch trends after {MAX_RETRIES} attempts: {e}")
@@ -202,22 +308,16 @@ class TrendsFetcher:
         titles = [v.get("title", "") for v in videos if v.get("title")]
         descriptions = [v.get("description", "") for v in videos if v.get("description")]
         
-        # Simple keyword extraction (can be enhanced with NLP)
-        all_text = " ".join(titles + descriptions).lower()
-        
-        # Common words to ignore
-        stop_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "this", "that", "video", "watch", "youtube"}
-        
-        # Extract keywords (simple approach - can be improved)
-        words = all_text.split()
-        word_freq = {}
-        for word in words:
-            word = word.strip(".,!?;:()[]{}'\"")
-            if len(word) > 3 and word not in stop_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
+        # Extract keywords (simple approach - can be improved).
+        # Tokenize each title/description on its own rather than joining them all into one string.
+        word_freq = Counter()
+        for text in chain(titles, descriptions):
+            for word in text.lower().translate(_PUNCT_TABLE).split():
+                if len(word) > 3 and word not in _STOP_WORDS:
+                    word_freq[word] += 1
         
         # Get top keywords
-        top_keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_keywords = word_freq.most_common(10)
         
         # Get top video (first one, or can be based on views/likes)
         top_video = videos[0] if videos else None
@@ -231,27 +331,49 @@ class TrendsFetcher:
         }
     
     def _load_used_topics(self) -> set:
-        """Load previously used topics from file."""
-        if not os.path.exists(USED_TOPICS_FILE):
-            return set()
-        
+        """Load previously used topics from file (cached until the file's mtime changes)."""
         try:
-            with open(USED_TOPICS_FILE, 'r') as f:
-                data = json.load(f)
-                return set(data.get("used_topics", []))
-        except Exception as e:
-            logger.warning(f"Could not load used topics file: {e}")
-            return set()
+            mtime = os.stat(USED_TOPICS_FILE).st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._used_topics_cache is not None and mtime == self._used_topics_mtime:
+            return self._used_topics_cache
+        
+        used_topics = set()
+        if mtime is not None:
+            try:
+                with open(USED_TOPICS_FILE, 'r') as f:
+                    data = json.load(f)
+                    used_topics = set(data.get("used_topics", []))
+            except Exception as e:
+                logger.warning(f"Could not load used topics file: {e}")
+        
+        self._used_topics_cache = used_topics
+        self._used_topics_mtime = mtime
+        return used_topics
     
     def _save_used_topic(self, topic_title: str):
         """Save a topic title to the used topics file."""
+        # Re-reads the file if another writer changed it, so their topics are kept in the rewrite
         used_topics = self._load_used_topics()
         normalized = self._normalize_topic_title(topic_title)
+        if normalized in used_topics:
+            # Nothing changed, no need to rewrite the file
+            return
         used_topics.add(normalized)
         
         try:
-            with open(USED_TOPICS_FILE, 'w') as f:
-                json.dump({"used_topics": list(used_topics)}, f, indent=2)
+            # Write to a temp file and swap it in so a crash mid-write can't corrupt the file
+            tmp_path = USED_TOPICS_FILE + ".tmp"
+            payload = {"used_topics": list(used_topics)}
+            if orjson:
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps(payload))
+            else:
+                with open(tmp_path, 'w') as f:
+                    json.dump(payload, f, separators=(',', ':'))
+            os.replace(tmp_path, USED_TOPICS_FILE)
+            self._used_topics_mtime = os.stat(USED_TOPICS_FILE).st_mtime_ns
             logger.debug(f"Saved used topic: {topic_title}")
         except Exception as e:
             logger.warning(f"Could not save used topic: {e}")
@@ -264,22 +386,25 @@ class TrendsFetcher:
                 logger.info("Cleared used topics file")
             else:
                 logger.info("No used topics file to clear")
+            self._used_topics_cache = set()
+            self._used_topics_mtime = None
         except Exception as e:
             logger.warning(f"Could not clear used topics: {e}")
     
     def get_used_topics_count(self) -> int:
-        """Get the number of topics that have been used."""
+        """Get the number of topics that have been used (O(1) once the cache is loaded)."""
         return len(self._load_used_topics())
     
     def _normalize_topic_title(self, title: str) -> str:
-        """Normalize topic title for comparison (remove extra spaces, lowercase)."""
-        return title.lower().strip()
+        """Normalize topic title for comparison (lowercase, strip spaces) and hash it to a short digest."""
+        return hashlib.blake2b(title.lower().strip().encode('utf-8'), digest_size=8).hexdigest()
     
     def _is_topic_used(self, topic_title: str) -> bool:
         """Check if a topic has already been used."""
         used_topics = self._load_used_topics()
         normalized = self._normalize_topic_title(topic_title)
-        return normalized in used_topics
+        # Older entries (and those written by RedditFetcher) are plain lowercase titles
+        return normalized in used_topics or topic_title.lower().strip() in used_topics
     
     def get_trending_topic_for_video(self, region: str = "US", roblox_only: bool = True) -> Optional[Dict]:
         """
@@ -304,8 +429,6 @@ class TrendsFetcher:
         # Videos are already sorted by recency (recent first) from fetch_trending_videos
         # So we'll naturally prioritize recent content
         
-        analysis = self.analyze_trending_topics(videos)
-        
         # Try to find a video that hasn't been used yet (prioritizing recent ones)
         selected_video = None
         for video in videos:
@@ -315,23 +438,24 @@ class TrendsFetcher:
                 logger.info(f"Selected new trending topic: {video_title}")
                 # Log publish date if available to show it's recent
                 pub_date = video.get("published_at", "")
-                if pub_date:
+                if len(pub_date) == 20 and pub_date.endswith('Z'):
                     try:
-                        from datetime import datetime
-                        pub_dt = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-                        days_ago = (datetime.now() - pub_dt.replace(tzinfo=None)).days
+                        pub_dt = _parse_yt_ts(pub_date)
+                    except ValueError:
+                        # Right shape but malformed fields - just skip the recency note
+                        pub_dt = None
+                    if pub_dt is not None:
+                        days_ago = (datetime.now(timezone.utc).replace(tzinfo=None) - pub_dt).days
                         if days_ago <= 7:
                             logger.info(f"  ✓ Very recent content (published {days_ago} days ago)")
                         elif days_ago <= 30:
                             logger.info(f"  ✓ Recent content (published {days_ago} days ago)")
-                    except:
-                        pass
                 break
         
         # If all trending videos have been used, use the top one anyway
         # (but log a warning)
         if not selected_video:
-            selected_video = analysis.get("top_video")
+            selected_video = videos[0]
             if selected_video:
                 video_title = selected_video.get("title", "")
                 logger.warning(f"All trending topics have been used. Reusing: {video_title}")
@@ -343,6 +467,9 @@ class TrendsFetcher:
         # Mark this topic as used (will be saved after successful video creation)
         video_title = selected_video.get("title", "")
         
+        # Keyword analysis is only needed once a topic has actually been picked
+        analysis = self.analyze_trending_topics(videos)
+        
         return {
             "title": video_title,
             "description": selected_video.get("description", ""),
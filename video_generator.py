@@ -4,35 +4,507 @@ Handles video creation, status checking, and downloading.
 Now supports Roblox gameplay video backgrounds via download and upload.
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import time
+import random
 import os
 import tempfile
-from typing import Dict, Optional, List
+import shutil
+import re
+import subprocess
+import sys
+import threading
+import traceback
+import platform
+import importlib.util
+import bisect
+import functools
+import json
+import hashlib
+import mimetypes
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
 from config import HEYGEN_API_KEY, VIDEO_GENERATION_TIMEOUT, BACKGROUND_POT_URL
 
-# Try to import yt-dlp for YouTube video downloads
+# orjson is optional; fall back to the stdlib json module when it isn't installed
 try:
-    import yt_dlp
-    YT_DLP_AVAILABLE = True
+    import orjson
 except ImportError:
-    YT_DLP_AVAILABLE = False
+    orjson = None
+
+# yt-dlp for YouTube video downloads (imported lazily on first download - it is slow to import)
+YT_DLP_AVAILABLE = importlib.util.find_spec("yt_dlp") is not None
+if not YT_DLP_AVAILABLE:
     logging.warning("yt-dlp not available. Install with: pip install yt-dlp")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Directory of this module, and the files shipped next to it
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+_CAPTION_SCRIPT = os.path.join(_SCRIPT_DIR, "caption_video.py")
+_BG_AUDIO = os.path.join(_SCRIPT_DIR, "officialbg.mp3")
+
+# ffmpeg/ffprobe are resolved once at import instead of probing `ffmpeg -version` before every call
+# (and instead of a PATH search on every spawn)
+_FFMPEG_PATH = shutil.which("ffmpeg")
+_FFMPEG_OK = _FFMPEG_PATH is not None
+if not _FFMPEG_OK:
+    _FFMPEG_PATH = "ffmpeg"  # Unguarded calls still fail with FileNotFoundError, as before
+_FFPROBE_PATH = shutil.which("ffprobe") or "ffprobe"
+
+# aria2c lets yt-dlp download over several parallel connections when installed
+ARIA2_AVAILABLE = shutil.which("aria2c") is not None
+
 # Try to import AI text generator
 try:
-    from ai_text_generator import optimize_script_for_20_seconds, generate_content_script
+    from ai_text_generator import optimize_script_for_20_seconds, generate_content_script, generate_text_with_hf
     AI_AVAILABLE = True
 except ImportError:
     AI_AVAILABLE = False
     logger.warning("AI text generator not available, using basic script generation")
 
+# H.264 encoders in order of preference; hardware encoders are used when ffmpeg has them
+_H264_ENCODERS = ['h264_nvenc', 'h264_videotoolbox', 'h264_qsv', 'h264_vaapi', 'libx264']
+_HW_ENCODER = None
+
+
+def _detect_hw_encoder() -> str:
+    """
+    Pick the first H.264 encoder that ffmpeg lists and can actually open (cached after first call).
+    Falls back to libx264 when no hardware encoder works.
+    """
+    global _HW_ENCODER
+    if _HW_ENCODER is not None:
+        return _HW_ENCODER
+    
+    _HW_ENCODER = 'libx264'
+    if not _FFMPEG_OK:
+        return _HW_ENCODER
+    try:
+        listing = subprocess.run([_FFMPEG_PATH, '-hide_banner', '-encoders'],
+                                 capture_output=True, text=True, timeout=10).stdout
+        for encoder in _H264_ENCODERS[:-1]:
+            if encoder not in listing:
+                continue
+            # Listed encoders may still lack a device/driver, so encode one test frame
+            probe = subprocess.run(
+                [_FFMPEG_PATH, '-hide_banner', '-f', 'lavfi', '-i', 'color=s=256x256:d=0.1',
+                 '-frames:v', '1', '-c:v', encoder, '-f', 'null', '-'],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10
+            )
+            if probe.returncode == 0:
+                _HW_ENCODER = encoder
+                break
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        pass
+    
+    logger.info(f"Using H.264 encoder: {_HW_ENCODER}")
+    return _HW_ENCODER
+
+
+def _h264_args() -> List[str]:
+    """ffmpeg video codec arguments for the detected H.264 encoder."""
+    encoder = _detect_hw_encoder()
+    if encoder == 'h264_nvenc':
+        return ['-c:v', encoder, '-preset', 'p4', '-tune', 'hq', '-rc', 'vbr', '-cq', '23']
+    if encoder == 'h264_videotoolbox':
+        return ['-c:v', encoder, '-b:v', '8M']  # VideoToolbox is bitrate-driven (no CRF)
+    if encoder == 'libx264':
+        # veryfast rather than ultrafast: these files are uploaded, and ultrafast roughly doubles the size
+        return ['-c:v', encoder, '-preset', 'veryfast', '-threads', '0']
+    return ['-c:v', encoder]
+
+
 # HeyGen API configuration
 HEYGEN_API_BASE_URL = "https://api.heygen.com"
 
+# Language markers used to pick English voices (matched as whole words against "name language")
+_ENGLISH_TOKENS = frozenset({"en", "english", "us", "uk", "eng"})
+_NON_ENGLISH_TOKENS = frozenset({
+    "hi", "hindi", "es", "spanish", "fr", "french", "de", "german", "ja", "japanese",
+    "zh", "chinese", "pt", "portuguese", "it", "italian", "ru", "russian", "ko", "korean",
+    "ar", "arabic",
+})
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def _is_english_voice(voice: Dict) -> bool:
+    """True if a voice's name/language mark it as English and not another language."""
+    tokens = set(_TOKEN_RE.findall(f"{voice.get('name', '')} {voice.get('language', '')}".lower()))
+    if not tokens.isdisjoint(_NON_ENGLISH_TOKENS):
+        return False
+    return not tokens.isdisjoint(_ENGLISH_TOKENS)
+
+def _url_cache_key(url: str) -> str:
+    """Cache file name stem for a video URL (BLAKE2b, 128-bit)."""
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+
+def _snap_to_keyframe(start: float, keyframes: Optional[List[float]]) -> float:
+    """Move a clip start back to the nearest keyframe at or before it, so a stream-copy cut starts cleanly."""
+    if not keyframes:
+        return start
+    idx = bisect.bisect_right(keyframes, start) - 1
+    return keyframes[idx] if idx >= 0 else start
+
+
+def _read_info_json(path: str) -> Dict:
+    """Load a video_cache info file (orjson when available)."""
+    if orjson:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _encode_used_segments(used_segments: List[int]) -> str:
+    """Pack used segment starts into a hex bitmap (bit n = start n * SEGMENT_STEP)."""
+    mask = 0
+    for start in used_segments:
+        mask |= 1 << (int(start) // SEGMENT_STEP)
+    return format(mask, 'x')
+
+
+def _decode_used_segments(info: Dict) -> List[int]:
+    """Read used segment starts from cache info (hex bitmap, or the older plain list)."""
+    bitmap = info.get('used_bitmap')
+    if bitmap is None:
+        return info.get('used_segments', [])
+    mask = int(bitmap, 16)
+    return [i * SEGMENT_STEP for i in range(mask.bit_length()) if (mask >> i) & 1]
+
+
+def _is_mp4(path: str) -> bool:
+    """True if the file starts with an ISO-BMFF 'ftyp' box (MP4/MOV)."""
+    with open(path, 'rb') as f:
+        head = f.read(12)
+    return head[4:8] == b'ftyp'
+
+
+def _is_mpegts(path: str) -> bool:
+    """True if the file has MPEG-TS sync bytes (0x47) at the start of its first three 188-byte packets."""
+    with open(path, 'rb') as f:
+        head = f.read(188 * 3)
+    return len(head) == 188 * 3 and all(head[i] == 0x47 for i in (0, 188, 376))
+
+
+# Title filters for background parkour videos (substring matches, like the old `in` checks)
+_EXCLUDE_KEYWORDS = [
+    "review", "news", "update", "trailer", "announcement", "explained",
+    "guide", "tutorial", "tips", "tricks", "how to", "howto", "how to build",
+    "reaction", "react", "reacting", "discussion", "talk", "talking",
+    "story", "storytime", "animation", "animated", "meme", "memes",
+    "top 10", "ranking", "list", "comparison", "vs", "versus",
+    "minecraft news", "minecraft update", "minecraft review", "minecraft mod"
+]
+_EXCLUDE_RE = re.compile("|".join(map(re.escape, _EXCLUDE_KEYWORDS)))
+_PARKOUR_RE = re.compile(r"parkour")
+
+# HeyGen 400 messages that mean the video background was rejected (matched on the lowercased
+# message; "video_asset_id" also covers "either url or video_asset_id ...")
+_VIDEO_BG_ERROR_RE = re.compile(r"video.*background|background.*video|play_style|video_asset_id", re.DOTALL)
+
+# Script post-processing patterns used by _generate_script_from_trend
+_WORD_RE = re.compile(r"\b\w{4,}\b")
+_WS_RE = re.compile(r"\s+")
+# Maps '!' and '?' to '.' so sentences can be split with a plain str.split
+_PUNCT_TABLE = str.maketrans({'!': '.', '?': '.'})
+_END_PUNCT = ('.', '!', '?')
+# Generic openers that make a poor hook for the fallback story script
+_HOOK_PHRASES = ("i have a story", "let me tell you", "i want to share", "i have something")
+# Folds curly single quotes to ASCII so phrase checks ignore typographic apostrophes
+_SMART_QUOTE_TABLE = str.maketrans({"\u2019": "'", "\u2018": "'"})
+_FILLER_RE = re.compile(
+    r"^(?:i have a story|let me tell you|buckle up|like the title says|get ready|prepare yourself"
+    r"|listen to this|you won't believe|wait until you hear|this story|here's what happened)[\s.,:;]*",
+    re.IGNORECASE,
+)
+
+
+# Fallback script expansion templates; each ends with its closing sentence
+_TOPIC_SMOKING_RE = re.compile(r"smok|cig", re.IGNORECASE)
+_SMOKING_CLOSURE = "Now when he offers, I just say no—and he finally respects it."
+_SMOKING_EXPANSION = (
+    "Every time we hung out, he would offer me one like it was nothing.",
+    "I kept saying no, but he treated it like a joke instead of a boundary.",
+    "It wasn’t the cigarette that got to me—it was the way he ignored what I was trying to change.",
+    "I could feel that old craving creeping back in, and it made me angry at myself.",
+    "When I finally told him the real reason I quit, everything got quiet.",
+    "After that, he showed up trying to help instead of tempt me, and that meant more than I expected.",
+    _SMOKING_CLOSURE,
+)
+_GENERIC_CLOSURE = "In the end, it was resolved—and I didn’t have to become someone I’m not to get there."
+_GENERIC_EXPANSION = (
+    "At first, I tried to brush it off, but it kept happening.",
+    "The more I thought about it, the more it bothered me.",
+    "I didn’t want drama—I just wanted to be heard.",
+    "When I finally spoke up, the whole mood changed.",
+    "Afterward, I realized I should’ve said something sooner.",
+    _GENERIC_CLOSURE,
+)
+
+
+def _word_count(text: str) -> int:
+    """Count words in single-spaced text (see _WS_RE) without building a list."""
+    text = text.strip()
+    return text.count(' ') + 1 if text else 0
+
+
+def _split_sentences(text: str, min_len: int = 0) -> List[str]:
+    """Split text on sentence punctuation, returning stripped sentences longer than min_len."""
+    return [s for s in map(str.strip, text.translate(_PUNCT_TABLE).split('.')) if len(s) > min_len]
+
+
+# Curated Unsplash fallback backgrounds, built on first use by _get_background_image_url
+_CURATED_IMAGES = None
+
+
+def _build_curated_images() -> List[str]:
+    """Portrait copyright-free images (Unsplash License, free for commercial use)."""
+    return [
+        # Abstract/Gradient backgrounds (portrait format)
+        "https://images.unsplash.com/photo-1557672172-298e090bd0f1?w=720&h=1280&fit=crop&q=80",  # Abstract gradient
+        "https://images.unsplash.com/photo-1557683316-973673baf926?w=720&h=1280&fit=crop&q=80",  # Colorful gradient
+        "https://images.unsplash.com/photo-1557682250-33bd709cbe85?w=720&h=1280&fit=crop&q=80",  # Abstract colors
+        "https://images.unsplash.com/photo-1557682257-2f9c37a3a320?w=720&h=1280&fit=crop&q=80",  # Gradient background
+        "https://images.unsplash.com/photo-1557683311-eac922347aa1?w=720&h=1280&fit=crop&q=80",  # Modern gradient
+        "https://images.unsplash.com/photo-1557682224-5b8590cd9ec5?w=720&h=1280&fit=crop&q=80",  # Colorful abstract
+        "https://images.unsplash.com/photo-1557682250-33bd709cbe85?w=720&h=1280&fit=crop&q=80",  # Vibrant colors
+        "https://images.unsplash.com/photo-1557683316-973673baf926?w=720&h=1280&fit=crop&q=80",  # Smooth gradient
+    ]
+
+
+# How long the on-disk avatar/voice list cache stays valid (seconds)
+AVATAR_CACHE_TTL = 86400  # 24 hours
+
+# Block size for streaming binary downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Finished videos at least this large are fetched as parallel byte ranges when the CDN allows it
+DOWNLOAD_RANGE_MIN_SIZE = 8 << 20  # 8 MiB
+DOWNLOAD_RANGE_PARTS = 4
+
+# Upload attempts for transient HeyGen upload failures (5xx / connection errors)
+UPLOAD_MAX_ATTEMPTS = 3
+
+# Background segment layout: clip length and the grid of candidate start times (seconds)
+SEGMENT_DURATION = 59  # HeyGen background clips must stay under 1 minute
+SEGMENT_STEP = 5  # Start times are multiples of this, which reduces near-duplicate clips
+SEGMENT_MIN_START = 15  # Avoid starting at 0 unless the video is too short
+
+# Pipe ffmpeg's clip output straight into the HeyGen upload (chunked body, no temp file).
+# Opt-in because it relies on the upload endpoint accepting chunked transfer encoding.
+STREAM_CLIP_UPLOAD = os.environ.get("STREAM_CLIP_UPLOAD", "").lower() in ("1", "true", "yes")
+
+# Status polling: first interval, growth x1.5 per unchanged poll, cap (seconds)
+POLL_INTERVAL_START = 5.0
+MAX_POLL_INTERVAL = 30
+# Render states reported by video_status.get
+_STATUS_COMPLETED = "completed"
+_STATUS_FAILED = frozenset({"failed", "error"})
+
+# Hard cap on the finished video's length (YouTube Shorts must stay under 60s)
+FINAL_MAX_DURATION = 59
+
+# Background music level under the voiceover (30%, raised 15% on request)
+BG_MUSIC_VOLUME = 0.3 * 1.15
+
+# Lines of caption-script stdout/stderr kept for error logging (the rest is streamed to debug)
+CAPTION_OUTPUT_TAIL_LINES = 40
+
+
+# Multi-line error reports for HeyGen error codes, shared by create_video and wait_for_video.
+# {message}/{detail} come from the API error; {extra} is optional caller context.
+_HEYGEN_ERROR_TEMPLATES = {
+    "RESOLUTION_NOT_ALLOWED": """✗ Resolution not allowed for your plan
+   Error: {message}
+   Detail: {detail}{extra}
+
+   Current resolution: 720x1280 (720p vertical)
+   Free plan supports: 720p maximum
+   Please upgrade your HeyGen plan for higher resolutions""",
+    "MOVIO_VIDEO_IS_TOO_LONG": """✗ Video is too long (> 180 seconds)
+   Error: {message}
+   Detail: {detail}{extra}
+
+   HeyGen Free Plan Limit:
+   - Maximum video length: 180 seconds (3 minutes)
+   - Your script is too long for the free plan
+
+   Solutions:
+   1. Shorten your script to ~30-40 words (15-20 seconds)
+   2. Upgrade your HeyGen plan for longer videos
+   3. Split the content into multiple shorter videos""",
+    "MOVIO_PAYMENT_INSUFFICIENT_CREDIT": """✗ Insufficient credits for video generation
+   Error: {message}
+   Detail: {detail}{extra}
+
+   HeyGen Credit System:
+   - Photo Avatar: 1 credit per minute (30-second increments)
+   - Video Avatar: 2 credits per minute (30-second increments)
+   - A 30-second video typically costs 1 credit
+
+   Troubleshooting:
+   1. Check your HeyGen dashboard for accurate credit balance
+   2. Credits may be reserved/held for pending jobs
+   3. Wait for pending jobs to complete and credits to be released
+   4. Ensure you have at least 1 credit available""",
+}
+
+
+def _log_heygen_error(code: str, message: str, detail: str, extra: str = "") -> bool:
+    """
+    Log the report for a known HeyGen error code as a single record.
+    
+    Args:
+        code: HeyGen error code
+        message: Error message from the API
+        detail: Error detail from the API
+        extra: Additional context lines appended after the detail
+        
+    Returns:
+        True if the code has a template (and was logged), False otherwise
+    """
+    template = _HEYGEN_ERROR_TEMPLATES.get(code)
+    if template is None:
+        return False
+    logger.error(template.format(message=message, detail=detail, extra=extra))
+    return True
+
+
+# Where HeyGen responses put the video ID / finished video URL, in lookup order
+_VIDEO_ID_PATHS = (("data", "video_id"), ("video_id",), ("data", "id"), ("id",))
+_VIDEO_URL_PATHS = (("video_url",), ("url",), ("download_url",))
+
+
+def _dig(data: Dict, paths) -> Optional[str]:
+    """Return the first truthy value found along the given key paths of a nested dict."""
+    for path in paths:
+        cur = data
+        for key in path:
+            if not isinstance(cur, dict) or key not in cur:
+                break
+            cur = cur[key]
+        else:
+            if cur:
+                return cur
+    return None
+
+
+class _ProgressReader:
+    """File-like wrapper that logs download progress, throttled by time rather than per chunk."""
+    
+    def __init__(self, raw, total_size: int, interval: float = 2.0):
+        self._raw = raw
+        self._total = total_size
+        self._interval = interval
+        self._read = 0
+        self._last_log = time.monotonic()
+    
+    @property
+    def bytes_read(self) -> int:
+        return self._read
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self._read += len(data)
+        now = time.monotonic()
+        if self._total and now - self._last_log >= self._interval:
+            self._last_log = now
+            percent = (self._read / self._total) * 100
+            logger.info(f"Download progress: {percent:.1f}% ({self._read}/{self._total} bytes)")
+        return data
+
+
+def _drain_stream(stream, tail: deque, name: str):
+    """Read a subprocess pipe line by line, logging live and keeping only the last lines in tail."""
+    for line in iter(stream.readline, ""):
+        line = line.rstrip("\n")
+        tail.append(line)
+        logger.debug("[caption %s] %s", name, line)
+    stream.close()
+
+
+def _copy_bytes(src, dst, count: int):
+    """Copy exactly count bytes from file-like src to dst in DOWNLOAD_CHUNK_SIZE blocks."""
+    while count > 0:
+        data = src.read(min(DOWNLOAD_CHUNK_SIZE, count))
+        if not data:
+            raise IOError(f"stream ended with {count} bytes still expected")
+        dst.write(data)
+        count -= len(data)
+
+
+def _fetch_range(url: str, output_path: str, start: int, end: int):
+    """Download bytes start..end (inclusive) of url into the same offsets of an existing file."""
+    with requests.get(url, headers={"Range": f"bytes={start}-{end}"}, timeout=300, stream=True) as response:
+        if response.status_code != 206:
+            raise IOError(f"range request not honoured (HTTP {response.status_code})")
+        with open(output_path, 'r+b') as f:
+            f.seek(start)
+            _copy_bytes(response.raw, f, end - start + 1)
+
+
+@functools.lru_cache(maxsize=32)
+def _ffprobe_media(path: str, mtime_ns: int, size: int) -> Dict:
+    """Run ffprobe once per file version (mtime/size are part of the cache key). Raises on failure."""
+    result = subprocess.run(
+        [_FFPROBE_PATH, '-v', 'error', '-show_entries',
+         'format=duration:stream=codec_type,width,height,r_frame_rate', '-of', 'json', path],
+        capture_output=True, text=True, timeout=10, check=True
+    )
+    data = json.loads(result.stdout)
+    streams = data.get("streams", [])
+    video = next((st for st in streams if st.get("codec_type") == "video"), {})
+    num, _, den = video.get("r_frame_rate", "0/1").partition("/")
+    return {
+        "duration": float(data.get("format", {}).get("duration") or 0) or None,
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "fps": float(num) / float(den) if float(den or 0) else None,
+        "has_audio": any(st.get("codec_type") == "audio" for st in streams),
+    }
+
+
+def _probe_media(path: str) -> Optional[Dict]:
+    """
+    Duration, size, frame rate and audio presence of a media file from a single ffprobe call.
+    Results are cached until the file changes.
+    
+    Returns:
+        {"duration", "width", "height", "fps", "has_audio"}, or None if the file can't be probed
+    """
+    try:
+        st = os.stat(path)
+        return _ffprobe_media(path, st.st_mtime_ns, st.st_size)
+    except (subprocess.SubprocessError, OSError, ValueError) as e:
+        logger.warning(f"Could not probe {path}: {e}")
+        return None
+
+
+def _json_body(response: requests.Response) -> Dict:
+    """Parse a JSON response body once; {} when the body isn't a JSON object."""
+    if not response.headers.get("content-type", "").startswith("application/json"):
+        return {}
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0, jitter: float = 0.5) -> float:
+    """Retry delay: base * 2**attempt scaled by up to +jitter, capped at cap seconds."""
+    return min(cap, base * 2 ** attempt * (1 + random.uniform(0, jitter)))
+
+
+def _poll_interval(attempt: int) -> float:
+    """Exponential backoff with jitter for status polling: ~1s, 1.5s, 2.3s, ... capped at MAX_POLL_INTERVAL."""
+    return min(MAX_POLL_INTERVAL, 1.5 ** attempt + random.uniform(0, 0.5))
+
 
 class VideoGenerator:
     """Generates videos using HeyGen API."""
@@ -60,107 +532,170 @@ class VideoGenerator:
             "X-API-KEY": self.api_key,
             "Content-Type": "application/json"
         }
-        
-        logger.debug(f"Initialized VideoGenerator with API key: {self.api_key[:20]}...")
+        # Persistent session so all HeyGen API requests reuse keep-alive connections
+        # (pooled per host; connection failures are retried with backoff by urllib3).
+        # Transient HTTP statuses are only retried for idempotent methods - POSTs go
+        # through _post_with_backoff so a retried create can't start a duplicate render.
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                              max_retries=Retry(total=3, backoff_factor=0.5,
+                                                status_forcelist=(429, 500, 502, 503, 504),
+                                                raise_on_status=False))
+        self._session.mount("https://", adapter)
+        
+        logger.debug("Initialized VideoGenerator with API key: %s...", self.api_key[:20])
         if youtube_service:
             logger.debug("YouTube service available for Roblox gameplay video fetching")
         
         # Cache for avatars and voices (fetch once)
         self._avatars = None
         self._voices = None
+        self._english_voices = None  # Filtered from _voices on first use
+        # Parsed video_cache/*_info.json files keyed by path, as (mtime, info)
+        self._cache_index: Dict[str, Tuple[float, Dict]] = {}
+        # (ids, names) lists for O(1) random sampling, built alongside the lists above
+        self._avatar_index = None
+        self._english_voice_index = None
+        # Result of the PyTorch/NumPy probe for captioning (None = not yet checked)
+        self._caption_deps_ok: Optional[bool] = None
         # Note: avatar_id and voice_id are NOT cached - randomized each video
     
+    def _disk_cache_path(self, name: str) -> str:
+        """Path of the on-disk cache file for a HeyGen list, scoped to this API key."""
+        key_hash = hashlib.sha256(self.api_key.encode()).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), f"heygen_{name}_{key_hash}.json")
+    
+    def _load_disk_cache(self, name: str) -> Optional[List]:
+        """Load a cached HeyGen list from disk if it exists and is younger than AVATAR_CACHE_TTL."""
+        try:
+            with open(self._disk_cache_path(name), 'r') as f:
+                cached = json.load(f)
+            if time.time() - cached.get("ts", 0) < AVATAR_CACHE_TTL and cached.get("data"):
+                return cached["data"]
+        except (OSError, ValueError):
+            pass
+        return None
+    
+    def _save_disk_cache(self, name: str, data: List):
+        """Save a HeyGen list to the on-disk cache."""
+        try:
+            with open(self._disk_cache_path(name), 'w') as f:
+                json.dump({"ts": time.time(), "data": data}, f)
+        except OSError as e:
+            logger.debug("Could not write %s cache: %s", name, e)
+    
     def _get_avatars(self):
-        """Get list of available avatars (cached)."""
+        """Get list of available avatars (cached in memory and on disk)."""
+        if self._avatars is None:
+            self._avatars = self._load_disk_cache("avatars")
+            if self._avatars is not None:
+                logger.info(f"Loaded {len(self._avatars)} avatars from cache")
         if self._avatars is None:
             url = f"{HEYGEN_API_BASE_URL}/v2/avatars"
             try:
-                response = requests.get(url, headers=self.headers, timeout=30)
+                response = self._session.get(url, timeout=30)
                 if response.status_code == 200:
                     result = response.json()
                     self._avatars = result.get("data", {}).get("avatars", []) or result.get("avatars", [])
                     logger.info(f"Found {len(self._avatars)} available avatars")
+                    self._save_disk_cache("avatars", self._avatars)
                 else:
                     logger.error(f"Failed to list avatars: {response.status_code}")
                     if response.status_code == 401:
                         logger.error("Authentication failed. Please check your HEYGEN_API_KEY")
                         logger.error(f"API Key (first 20 chars): {self.api_key[:20] if self.api_key else 'NOT SET'}...")
-                    logger.debug(f"Response: {response.text[:200]}")
+                    logger.debug("Response: %s", response.text[:200])
                     self._avatars = []
             except Exception as e:
                 logger.error(f"Error listing avatars: {e}")
                 self._avatars = []
         return self._avatars
     
-    def _get_voices(self):
-        """Get list of available voices (cached)."""
+    def _get_voices(self, refresh: bool = False):
+        """
+        Get list of available voices (cached in memory and on disk).
+        
+        Args:
+            refresh: If True, skip the on-disk cache and fetch a fresh list from HeyGen
+        """
+        if self._voices is None and not refresh:
+            self._voices = self._load_disk_cache("voices")
+            if self._voices is not None:
+                logger.info(f"Loaded {len(self._voices)} voices from cache")
         if self._voices is None:
             url = f"{HEYGEN_API_BASE_URL}/v2/voices"
             try:
-                response = requests.get(url, headers=self.headers, timeout=30)
+                response = self._session.get(url, timeout=30)
                 if response.status_code == 200:
                     result = response.json()
                     self._voices = result.get("data", {}).get("voices", []) or result.get("voices", [])
                     logger.info(f"Found {len(self._voices)} available voices")
+                    self._save_disk_cache("voices", self._voices)
                 else:
                     logger.error(f"Failed to list voices: {response.status_code}")
                     if response.status_code == 401:
                         logger.error("Authentication failed. Please check your HEYGEN_API_KEY")
                         logger.error(f"API Key (first 20 chars): {self.api_key[:20] if self.api_key else 'NOT SET'}...")
-                    logger.debug(f"Response: {response.text[:200]}")
+                    logger.debug("Response: %s", response.text[:200])
                     self._voices = []
             except Exception as e:
                 logger.error(f"Error listing voices: {e}")
                 self._voices = []
         return self._voices
     
+    def _prefetch_metadata(self):
+        """Fetch the avatar and voice lists concurrently instead of one after the other."""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            avatars_future = executor.submit(self._get_avatars)
+            voices_future = executor.submit(self._get_voices)
+            avatars_future.result()
+            voices_future.result()
+    
+    def _get_english_voices(self) -> List[Dict]:
+        """Get the English subset of the available voices (filtered once, then cached)."""
+        if self._english_voices is None:
+            # English (common patterns: "en", "english", "us", "uk", "eng") and not another language
+            english_voices = [voice for voice in self._get_voices() if _is_english_voice(voice)]
+            self._english_voices = english_voices
+            self._english_voice_index = self._build_index(english_voices, "voice_id")
+        return self._english_voices
+    
+    @staticmethod
+    def _build_index(items: List[Dict], id_key: str):
+        """Flatten avatar/voice dicts into parallel (ids, names) lists for random sampling."""
+        ids = [item.get(id_key) or item.get("id") for item in items]
+        names = [item.get("name", "Unknown") for item in items]
+        return ids, names
+    
     def _get_random_avatar_and_voice(self):
         """Get random avatar and voice IDs - switches avatar every video. Only uses English voices."""
-        import random
-        
+        if self._avatars is None and self._voices is None:
+            self._prefetch_metadata()
         avatars = self._get_avatars()
         voices = self._get_voices()
         
         if avatars:
             # Randomly select an avatar (switches every video)
-            avatar = random.choice(avatars)
-            avatar_id = avatar.get("avatar_id") or avatar.get("id")
-            logger.info(f"Using random avatar: {avatar.get('name', 'Unknown')} (ID: {avatar_id})")
+            if self._avatar_index is None:
+                self._avatar_index = self._build_index(avatars, "avatar_id")
+            avatar_ids, avatar_names = self._avatar_index
+            idx = random.randrange(len(avatar_ids))
+            avatar_id = avatar_ids[idx]
+            logger.info(f"Using random avatar: {avatar_names[idx]} (ID: {avatar_id})")
         else:
             raise ValueError("No avatars available")
         
         if voices:
-            # Filter for English voices only
-            english_voices = []
-            for voice in voices:
-                voice_name = voice.get('name', '').lower()
-                voice_lang = voice.get('language', '').lower()
-                voice_id_str = voice.get("voice_id") or voice.get("id", "")
-                
-                # Check if it's English (common patterns: "en", "english", "us", "uk", "eng")
-                is_english = (
-                    'en' in voice_lang or 
-                    'english' in voice_lang or
-                    'en' in voice_name or
-                    'english' in voice_name or
-                    'us' in voice_lang or
-                    'uk' in voice_lang
-                )
-                
-                # Exclude non-English languages
-                non_english_indicators = ['hi', 'hindi', 'es', 'spanish', 'fr', 'french', 'de', 'german', 
-                                         'ja', 'japanese', 'zh', 'chinese', 'pt', 'portuguese', 'it', 'italian',
-                                         'ru', 'russian', 'ko', 'korean', 'ar', 'arabic']
-                is_non_english = any(indicator in voice_lang or indicator in voice_name for indicator in non_english_indicators)
-                
-                if is_english and not is_non_english:
-                    english_voices.append(voice)
+            # Filter for English voices only (computed once, then reused)
+            english_voices = self._get_english_voices()
             
             if english_voices:
                 # Randomly select an English voice
-                voice = random.choice(english_voices)
-                voice_id = voice.get("voice_id") or voice.get("id")
-                logger.info(f"Using random English voice: {voice.get('name', 'Unknown')} (ID: {voice_id})")
+                voice_ids, voice_names = self._english_voice_index
+                idx = random.randrange(len(voice_ids))
+                voice_id = voice_ids[idx]
+                logger.info(f"Using random English voice: {voice_names[idx]} (ID: {voice_id})")
             else:
                 # Fallback: use any voice if no English voices found
                 logger.warning("No English voices found, using any available voice")
@@ -172,16 +707,11 @@ class VideoGenerator:
         
         return avatar_id, voice_id
     
-    def _get_minecraft_parkour_video_url(self, topic: str, keywords: list = None, youtube_service=None) -> Optional[str]:
+    def _get_background_url(self) -> Optional[str]:
         """
-        Get a relevant Minecraft parkour video URL for background.
-        Prioritizes parkour-specific videos, falls back to any Minecraft parkour.
+        Get the background video URL.
+        Uses the configured "pot" URL when set, otherwise searches YouTube for a Minecraft parkour video.
         
-        Args:
-            topic: Main topic/title (not used for Minecraft, but kept for compatibility)
-            keywords: List of keywords (not used for Minecraft, but kept for compatibility)
-            youtube_service: YouTube API service object
-            
         Returns:
             Video URL if found, None otherwise
         """
@@ -190,10 +720,20 @@ class VideoGenerator:
         if BACKGROUND_POT_URL:
             logger.info(f"Using configured background pot URL: {BACKGROUND_POT_URL}")
             return BACKGROUND_POT_URL
-
-        try:
-            import re
+        return self._search_youtube_parkour(self.youtube_service)
+    
+    def _search_youtube_parkour(self, youtube_service) -> Optional[str]:
+        """
+        Search YouTube for a Minecraft parkour video URL for background.
+        Prioritizes parkour-specific videos, falls back to any Minecraft parkour.
+        
+        Args:
+            youtube_service: YouTube API service object
             
+        Returns:
+            Video URL if found, None otherwise
+        """
+        try:
             if not youtube_service:
                 logger.warning("YouTube service not available, cannot fetch Minecraft parkour video")
                 return None
@@ -224,18 +764,8 @@ class VideoGenerator:
                     
                     videos = search_response.get("items", [])
                     if videos:
-                        # Extract video IDs
-                        video_ids = [item["id"]["videoId"] for item in videos]
-                        
-                        # Get video details for all videos at once
-                        video_request = youtube_service.videos().list(
-                            part="snippet",
-                            id=",".join(video_ids)
-                        )
-                        video_response = video_request.execute()
-                        
-                        # Check each video to find actual parkour videos
-                        for video_item in video_response.get("items", []):
+                        # Check each video to find actual parkour videos (snippet comes with the search result)
+                        for video_item in videos:
                             title = video_item["snippet"].get("title", "").lower()
                             description = video_item["snippet"].get("description", "").lower()
                             
@@ -244,28 +774,17 @@ class VideoGenerator:
                                 continue
                             
                             # STRICT filtering for actual parkour videos (exclude reviews, tutorials, etc.)
-                            exclude_keywords = [
-                                "review", "news", "update", "trailer", "announcement", "explained", 
-                                "guide", "tutorial", "tips", "tricks", "how to", "howto", "how to build",
-                                "reaction", "react", "reacting", "discussion", "talk", "talking",
-                                "story", "storytime", "animation", "animated", "meme", "memes",
-                                "top 10", "ranking", "list", "comparison", "vs", "versus",
-                                "minecraft news", "minecraft update", "minecraft review", "minecraft mod"
-                            ]
-                            if any(exclude in title for exclude in exclude_keywords):
+                            if _EXCLUDE_RE.search(title):
                                 continue
                             
                             # REQUIRE parkour keywords in TITLE
-                            parkour_keywords = ["parkour", "parkour no commentary", "parkour gameplay", "parkour montage"]
-                            has_parkour_in_title = any(keyword in title for keyword in parkour_keywords)
-                            
-                            if not has_parkour_in_title:
+                            if not _PARKOUR_RE.search(title):
                                 continue  # Skip if no parkour keyword in title
                             
                             # Prefer "no commentary" videos (pure parkour)
                             is_no_commentary = "no commentary" in title
                             
-                            video_id = video_item["id"]
+                            video_id = video_item["id"]["videoId"]
                             video_url = f"https://www.youtube.com/watch?v={video_id}"
                             video_title = video_item['snippet'].get('title', 'Unknown')
                             
@@ -298,7 +817,6 @@ class VideoGenerator:
             
         except Exception as e:
             logger.warning(f"Error getting Minecraft parkour video: {e}")
-            import traceback
             logger.debug(traceback.format_exc())
             return None
     
@@ -315,11 +833,13 @@ class VideoGenerator:
             keywords: List of keywords
             
         Returns:
-            Image URL if found, None otherwise
+            Image URL if found, None otherwise (always None when BACKGROUND_POT_URL is set)
         """
+        # The pot video is the background in production, so skip the Pexels/curated lookup entirely
+        if BACKGROUND_POT_URL:
+            return None
+        
         try:
-            import urllib.parse
-            import re
             from config import PEXELS_API_KEY
             
             # Extract search query from topic/keywords
@@ -380,7 +900,7 @@ class VideoGenerator:
                     else:
                         logger.warning(f"Pexels API returned {response.status_code}, using fallback")
                 except Exception as api_error:
-                    logger.debug(f"Pexels API error: {api_error}, using fallback")
+                    logger.debug("Pexels API error: %s, using fallback", api_error)
             else:
                 logger.info("Pexels API key not set. Using fallback method.")
                 logger.info("Get free API key from: https://www.pexels.com/api/")
@@ -388,17 +908,10 @@ class VideoGenerator:
             # Fallback: Use curated copyright-free image URLs
             # These are known-good Unsplash images that are free to use
             # All images are under Unsplash License (free for commercial use)
-            curated_images = [
-                # Abstract/Gradient backgrounds (portrait format)
-                "https://images.unsplash.com/photo-1557672172-298e090bd0f1?w=720&h=1280&fit=crop&q=80",  # Abstract gradient
-                "https://images.unsplash.com/photo-1557683316-973673baf926?w=720&h=1280&fit=crop&q=80",  # Colorful gradient
-                "https://images.unsplash.com/photo-1557682250-33bd709cbe85?w=720&h=1280&fit=crop&q=80",  # Abstract colors
-                "https://images.unsplash.com/photo-1557682257-2f9c37a3a320?w=720&h=1280&fit=crop&q=80",  # Gradient background
-                "https://images.unsplash.com/photo-1557683311-eac922347aa1?w=720&h=1280&fit=crop&q=80",  # Modern gradient
-                "https://images.unsplash.com/photo-1557682224-5b8590cd9ec5?w=720&h=1280&fit=crop&q=80",  # Colorful abstract
-                "https://images.unsplash.com/photo-1557682250-33bd709cbe85?w=720&h=1280&fit=crop&q=80",  # Vibrant colors
-                "https://images.unsplash.com/photo-1557683316-973673baf926?w=720&h=1280&fit=crop&q=80",  # Smooth gradient
-            ]
+            global _CURATED_IMAGES
+            if _CURATED_IMAGES is None:
+                _CURATED_IMAGES = _build_curated_images()
+            curated_images = _CURATED_IMAGES
             
             # Select image based on query hash (deterministic but varied)
             image_index = abs(hash(query)) % len(curated_images)
@@ -414,25 +927,24 @@ class VideoGenerator:
             logger.warning(f"Error getting background image: {e}, using default color")
             return None
     
-    def _trim_video(self, input_path: str, output_path: str = None, max_duration: int = 60, start_time: int = 0) -> Optional[str]:
+    def _trim_video(self, input_path: str, output_path: str = None, max_duration: int = 60, start_time: int = 0,
+                    frame_accurate: bool = False) -> Optional[str]:
         """
         Trim video to a maximum duration using ffmpeg.
+        By default streams are copied (cut at the nearest keyframe) instead of re-encoded.
         
         Args:
             input_path: Path to input video file
             output_path: Path to output trimmed video (if None, creates new file)
             max_duration: Maximum duration in seconds (default: 60)
             start_time: Start time in seconds (default: 0)
+            frame_accurate: If True, re-encode (hardware H.264 when available) for an exact cut
             
         Returns:
             Path to trimmed video file, or None if failed
         """
-        import subprocess
         
-        # Check if ffmpeg is available
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, timeout=5, check=True)
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
+        if not _FFMPEG_OK:
             logger.warning("ffmpeg not available - cannot trim video")
             return None
         
@@ -444,18 +956,22 @@ class VideoGenerator:
             logger.info(f"  Input: {os.path.basename(input_path)}")
             logger.info(f"  Output: {os.path.basename(output_path)}")
             
-            # Use ffmpeg to trim video
+            # Use ffmpeg to trim video (-ss before -i seeks the input directly)
             cmd = [
-                'ffmpeg',
-                '-i', input_path,
+                _FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
                 '-ss', str(start_time),  # Start time
+                '-i', input_path,
                 '-t', str(max_duration),  # Duration
-                '-c:v', 'libx264',  # H.264 video codec
-                '-c:a', 'copy',  # Copy audio (or use -an to remove)
+            ]
+            if frame_accurate:
+                cmd.extend(_h264_args() + ['-c:a', 'copy'])  # Re-encode video for an exact cut
+            else:
+                cmd.extend(['-c', 'copy'])  # Copy streams, no re-encode
+            cmd.extend([
                 '-avoid_negative_ts', 'make_zero',  # Fix timestamp issues
                 '-y',  # Overwrite output file
                 output_path
-            ]
+            ])
             
             result = subprocess.run(
                 cmd,
@@ -480,6 +996,65 @@ class VideoGenerator:
             logger.error(f"Error trimming video: {e}")
             return None
     
+    def _prepare_background(self, input_path: str, output_path: str, start: int, duration: int,
+                            mute: bool = True) -> Optional[str]:
+        """
+        Clip a background segment and write it as a faststart MP4 in one ffmpeg pass.
+        Trim and mute are fused: video is stream-copied and audio dropped with -an, so there
+        is no re-encode and no second ffmpeg run (_trim_video then _convert_to_mp4).
+        
+        Args:
+            input_path: Path to input video file
+            output_path: Path to output MP4 file
+            start: Start time in seconds
+            duration: Segment duration in seconds
+            mute: If True, drops the audio track (for background videos)
+            
+        Returns:
+            Path to the prepared clip, or None if failed
+        """
+        
+        if not _FFMPEG_OK:
+            logger.warning("ffmpeg not available - cannot prepare background video")
+            return None
+        
+        try:
+            logger.info(f"Clipping background segment {start}s-{start + duration}s{' (muted)' if mute else ''}...")
+            
+            cmd = [
+                _FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+                '-ss', str(start),  # Fast input seek
+                '-i', input_path,
+                '-t', str(duration),
+                '-c', 'copy',  # Copy streams, no re-encode
+                '-avoid_negative_ts', 'make_zero',
+                '-movflags', '+faststart',  # Optimize for streaming
+            ]
+            cmd.extend(['-an'] if mute else ['-c:a', 'aac'])
+            cmd.extend(['-y', output_path])
+            
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=300  # 5 minute timeout
+            )
+            
+            if result.returncode == 0 and os.path.exists(output_path):
+                size = os.path.getsize(output_path) / 1024 / 1024
+                logger.info(f"✓ Prepared background clip: {size:.2f} MB")
+                return output_path
+            
+            logger.error(f"Preparing background clip failed: {result.stderr[:200]}")
+            return None
+        
+        except subprocess.TimeoutExpired:
+            logger.error("Preparing background clip timed out")
+            return None
+        except Exception as e:
+            logger.error(f"Error preparing background clip: {e}")
+            return None
+    
     def _convert_to_mp4(self, input_path: str, output_path: str = None, mute_audio: bool = False) -> Optional[str]:
         """
         Convert video to MP4 format using ffmpeg.
@@ -493,12 +1068,8 @@ class VideoGenerator:
         Returns:
             Path to converted MP4 file, or None if failed
         """
-        import subprocess
         
-        # Check if ffmpeg is available
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, timeout=5, check=True)
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
+        if not _FFMPEG_OK:
             logger.warning("ffmpeg not available - cannot convert video format")
             return None
         
@@ -515,9 +1086,9 @@ class VideoGenerator:
             
             # Use ffmpeg to convert to MP4
             cmd = [
-                'ffmpeg',
+                _FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
                 '-i', input_path,
-                '-c:v', 'libx264',  # H.264 video codec
+                *_h264_args(),  # H.264 video codec
                 '-movflags', '+faststart',  # Optimize for streaming
                 '-y',  # Overwrite output file
             ]
@@ -554,7 +1125,7 @@ class VideoGenerator:
             logger.error(f"Error converting video: {e}")
             return None
     
-    def _download_youtube_video(self, youtube_url: str, output_path: str = None) -> Optional[str]:
+    def _download_youtube_video(self, youtube_url: str, output_path: str = None) -> Tuple[Optional[str], Optional[float]]:
         """
         Download a YouTube video using yt-dlp and ensure it's in MP4 format.
         
@@ -563,13 +1134,16 @@ class VideoGenerator:
             output_path: Optional path to save video (if None, uses temp file)
             
         Returns:
-            Path to downloaded video file (MP4 format), or None if failed
+            Tuple of (path to downloaded video file (MP4 format), duration in seconds from the
+            yt-dlp metadata). Path is None if failed; duration is None when yt-dlp did not report it.
         """
         if not YT_DLP_AVAILABLE:
             logger.warning("yt-dlp not available. Install with: pip install yt-dlp")
-            return None
+            return None, None
         
         try:
+            import yt_dlp
+            
             if not output_path:
                 # Create temp file
                 temp_dir = tempfile.mkdtemp()
@@ -589,6 +1163,11 @@ class VideoGenerator:
                 'noplaylist': True,
             }
             
+            if ARIA2_AVAILABLE:
+                ydl_opts['external_downloader'] = 'aria2c'
+                ydl_opts['external_downloader_args'] = ['-x', '16', '-k', '1M', '--file-allocation=none']
+                logger.info("  Using aria2c for parallel download")
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(youtube_url, download=True)
                 title = info.get('title', 'Unknown')
@@ -610,55 +1189,108 @@ class VideoGenerator:
                     trimmed_path = output_path.replace('.mp4', '_trimmed.mp4')
                     trimmed = self._trim_video(output_path, trimmed_path, max_duration=600, start_time=0)
                     if trimmed:
+                        duration = 600
                         try:
-                            os.remove(output_path)
-                            os.rename(trimmed_path, output_path)
+                            os.replace(trimmed_path, output_path)
                             logger.info(f"✓ Trimmed to 10 minutes for cache")
                         except:
                             output_path = trimmed_path
-                else:
+                    else:
                         logger.warning("Could not trim very long video, will use original")
                 
-                # Check if file is MPEG-TS and convert if needed
+                # Check if file is MPEG-TS and convert if needed (sniffed from the header bytes)
                 try:
-                    import subprocess
-                    result = subprocess.run(
-                        ['file', '-b', '--mime-type', output_path],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    mime_type = result.stdout.strip().lower()
-                    
-                    if 'mp2t' in mime_type or 'mpeg-ts' in mime_type:
+                    if not _is_mp4(output_path) and _is_mpegts(output_path):
                         logger.warning("Downloaded file is MPEG-TS format, converting to MP4...")
                         converted_path = self._convert_to_mp4(output_path)
                         if converted_path:
                             # Replace original with converted
                             try:
-                                os.remove(output_path)
-                                os.rename(converted_path, output_path)
+                                os.replace(converted_path, output_path)
                                 logger.info("✓ Successfully converted to MP4")
                             except:
                                 output_path = converted_path
                         else:
                             logger.warning("Conversion failed, will try upload anyway")
-                except (FileNotFoundError, subprocess.TimeoutExpired):
-                    # file command not available, skip format check
-                    pass
                 except Exception as e:
-                    logger.debug(f"Format check error: {e}")
+                    logger.debug("Format check error: %s", e)
                 
-                return output_path
+                return output_path, duration or None
             else:
                 logger.error("Download failed - file is empty or doesn't exist")
-                return None
+                return None, None
                     
         except Exception as e:
             logger.error(f"Failed to download YouTube video: {e}")
-            import traceback
             logger.debug(traceback.format_exc())
-        return None
+        return None, None
+    
+    def _stream_youtube_segment(self, youtube_url: str, output_path: str, start: Optional[int] = None,
+                                duration: int = SEGMENT_DURATION, mute: bool = True) -> Optional[str]:
+        """
+        Clip a segment straight from the YouTube stream without downloading the full video.
+        yt-dlp only resolves the direct stream URL; ffmpeg seeks into it with -ss, so only the
+        needed byte ranges are fetched. Only progressive HTTP(S) formats are used (DASH/HLS
+        need fragment assembly).
+        
+        Args:
+            youtube_url: YouTube video URL
+            output_path: Path to save the clip
+            start: Start time in seconds (if None, picks a random start in 5-second steps)
+            duration: Segment duration in seconds
+            mute: If True, drops the audio track (for background videos)
+            
+        Returns:
+            Path to the clip, or None if failed
+        """
+        if not YT_DLP_AVAILABLE or not _FFMPEG_OK:
+            return None
+        
+        try:
+            import yt_dlp
+            
+            ydl_opts = {
+                # Same worst-first preference as _download_youtube_video (smaller, less throttled)
+                'format': 'worst[ext=mp4][protocol^=http][acodec!=none]/worst[ext=mp4][protocol^=http]',
+                'quiet': True,
+                'noplaylist': True,
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(youtube_url, download=False)
+            
+            stream_url = info.get('url')
+            if not stream_url or info.get('protocol') not in ('http', 'https'):
+                logger.info("No progressive HTTP stream available, cannot stream segment")
+                return None
+            
+            if start is None:
+                max_start = max(0, int(info.get('duration') or 0) - duration)
+                start = random.randrange(0, max_start + 1, SEGMENT_STEP) if max_start else 0
+            
+            cmd = [_FFMPEG_PATH, '-hide_banner', '-loglevel', 'error']
+            headers = info.get('http_headers') or {}
+            if headers:
+                cmd.extend(['-headers', ''.join(f"{k}: {v}\r\n" for k, v in headers.items())])
+            cmd.extend(['-ss', str(start), '-i', stream_url, '-t', str(duration), '-c', 'copy',
+                        '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart'])
+            if mute:
+                cmd.append('-an')
+            cmd.extend(['-y', output_path])
+            
+            logger.info(f"Streaming segment {start}s-{start + duration}s from: {youtube_url[:80]}...")
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            
+            if result.returncode == 0 and os.path.exists(output_path) and os.path.getsize(output_path) > 1000:
+                size = os.path.getsize(output_path) / 1024 / 1024
+                logger.info(f"✓ Streamed segment: {size:.2f} MB")
+                return output_path
+            
+            logger.warning(f"Streaming segment failed: {result.stderr[:200]}")
+            return None
+        
+        except Exception as e:
+            logger.warning(f"Could not stream YouTube segment: {e}")
+            return None
     
     def _upload_video_to_heygen(self, video_path: str) -> Optional[str]:
         """
@@ -685,7 +1317,6 @@ class VideoGenerator:
             logger.info(f"  File size: {file_size:.2f} MB")
             
             # Detect actual file format
-            import mimetypes
             content_type, _ = mimetypes.guess_type(video_path)
             if not content_type:
                 # Default to mp4, but HeyGen will detect actual format
@@ -693,14 +1324,29 @@ class VideoGenerator:
             
             logger.info(f"  Detected content type: {content_type}")
             
-            with open(video_path, 'rb') as video_file:
-                # Send raw binary data with Content-Type header
-                response = requests.post(
-                    upload_url,
-                    data=video_file.read(),
-                    headers={**headers, 'Content-Type': content_type},
-                    timeout=120  # Upload can take time
-                )
+            for attempt in range(UPLOAD_MAX_ATTEMPTS):
+                try:
+                    with open(video_path, 'rb') as video_file:
+                        # Stream the file as the raw body with Content-Type header
+                        # (requests sets Content-Length from the file size and reads it in blocks)
+                        response = self._session.post(
+                            upload_url,
+                            data=video_file,
+                            headers={**headers, 'Content-Type': content_type},
+                            timeout=120  # Upload can take time
+                        )
+                    if response.status_code < 500:
+                        break
+                    error = f"HTTP {response.status_code}"
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt == UPLOAD_MAX_ATTEMPTS - 1:
+                        raise
+                    error = str(e)
+                
+                if attempt < UPLOAD_MAX_ATTEMPTS - 1:
+                    delay = _poll_interval(attempt + 2)  # ~2-4s, ~3.5-6s
+                    logger.warning(f"Upload attempt {attempt + 1} failed ({error}), retrying in {delay:.1f}s...")
+                    time.sleep(delay)
             
             if response.status_code == 200:
                 result = response.json()
@@ -721,10 +1367,73 @@ class VideoGenerator:
         
         except Exception as e:
             logger.error(f"Error uploading video to HeyGen: {e}")
-            import traceback
             logger.debug(traceback.format_exc())
         return None
     
+    def _upload_clip_streamed(self, input_path: str, start: float, duration: int) -> Optional[str]:
+        """
+        Clip, mute and upload a background segment in one pipeline.
+        ffmpeg writes a fragmented MP4 to stdout, which is sent as a chunked upload body while
+        ffmpeg is still running, so the clip never touches the disk.
+        
+        Args:
+            input_path: Path to the source video
+            start: Start time in seconds
+            duration: Segment duration in seconds
+            
+        Returns:
+            video_asset_id if successful, None otherwise
+        """
+        if not _FFMPEG_OK:
+            return None
+        
+        cmd = [
+            _FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+            '-ss', str(start), '-i', input_path, '-t', str(duration),
+            '-c', 'copy', '-an', '-avoid_negative_ts', 'make_zero',
+            '-f', 'mp4', '-movflags', 'frag_keyframe+empty_moov', 'pipe:1'
+        ]
+        
+        try:
+            logger.info(f"Streaming clip {start}s-{start + duration}s to HeyGen...")
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            posted = False
+            try:
+                response = self._session.post(
+                    "https://upload.heygen.com/v1/asset",
+                    data=iter(lambda: proc.stdout.read(DOWNLOAD_CHUNK_SIZE), b''),
+                    headers={'Content-Type': 'video/mp4'},
+                    timeout=120
+                )
+                posted = True
+            finally:
+                proc.stdout.close()
+                if not posted:
+                    # The upload died mid-stream; ffmpeg may be blocked on a full pipe
+                    proc.kill()
+                try:
+                    returncode = proc.wait(timeout=60)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    returncode = proc.wait()
+            
+            if returncode != 0:
+                logger.warning(f"ffmpeg exited with {returncode} while streaming clip")
+                return None
+            if response.status_code != 200:
+                logger.warning(f"Streamed upload failed: {response.status_code} {response.text[:200]}")
+                return None
+            
+            asset_data = response.json().get('data', {})
+            asset_id = asset_data.get('id') or asset_data.get('asset_id')
+            if asset_id:
+                logger.info(f"✓ Video uploaded successfully (streamed)! Asset ID: {asset_id}")
+            return asset_id
+        
+        except Exception as e:
+            logger.warning(f"Error streaming clip to HeyGen: {e}")
+            return None
+    
     def _get_cached_video_info(self, youtube_url: str) -> Optional[Dict]:
         """
         Get cached video information (path and used segments).
@@ -735,39 +1444,54 @@ class VideoGenerator:
         Returns:
             Dict with 'path' and 'used_segments' if cached, None otherwise
         """
-        import json
-        import hashlib
         
         # Create cache directory
         cache_dir = os.path.join(os.getcwd(), 'video_cache')
         os.makedirs(cache_dir, exist_ok=True)
         
         # Create hash of URL for filename
-        url_hash = hashlib.md5(youtube_url.encode()).hexdigest()
+        url_hash = _url_cache_key(youtube_url)
         cache_info_file = os.path.join(cache_dir, f'{url_hash}_info.json')
         cache_video_file = os.path.join(cache_dir, f'{url_hash}.mp4')
         
+        # Adopt a video cached under the old MD5 file names instead of re-downloading it
+        if not os.path.exists(cache_video_file):
+            legacy_hash = hashlib.md5(youtube_url.encode()).hexdigest()
+            legacy_video_file = os.path.join(cache_dir, f'{legacy_hash}.mp4')
+            if os.path.exists(legacy_video_file):
+                os.replace(legacy_video_file, cache_video_file)
+                legacy_info_file = os.path.join(cache_dir, f'{legacy_hash}_info.json')
+                if os.path.exists(legacy_info_file):
+                    os.replace(legacy_info_file, cache_info_file)
+        
         # Check if video file exists
         if os.path.exists(cache_video_file):
             # Load used segments info
             used_segments = []
+            duration = None
+            keyframes = None
             if os.path.exists(cache_info_file):
                 try:
-                    with open(cache_info_file, 'r') as f:
-                        info = json.load(f)
-                        used_segments = info.get('used_segments', [])
+                    info = _read_info_json(cache_info_file)
+                    if info:
+                        used_segments = _decode_used_segments(info)
+                        duration = info.get('duration')
+                        keyframes = info.get('keyframes')
                 except:
                     pass
             
             return {
                 'path': cache_video_file,
                 'used_segments': used_segments,
-                'url': youtube_url
+                'url': youtube_url,
+                'duration': duration,
+                'keyframes': keyframes
             }
         
         return None
     
-    def _save_cached_video_info(self, youtube_url: str, video_path: str, used_segments: List[int]):
+    def _save_cached_video_info(self, youtube_url: str, video_path: str, used_segments: List[int],
+                                duration: float = None, keyframes: List[float] = None):
         """
         Save cached video information.
         
@@ -775,56 +1499,94 @@ class VideoGenerator:
             youtube_url: YouTube video URL
             video_path: Path to cached video file
             used_segments: List of start times (in seconds) that have been used
+            duration: Video duration in seconds (cached so later runs skip ffprobe)
+            keyframes: Keyframe timestamps in seconds (seek-safe clip starts)
         """
-        import json
-        import hashlib
         
         # Create cache directory
         cache_dir = os.path.join(os.getcwd(), 'video_cache')
         os.makedirs(cache_dir, exist_ok=True)
         
         # Create hash of URL for filename
-        url_hash = hashlib.md5(youtube_url.encode()).hexdigest()
+        url_hash = _url_cache_key(youtube_url)
         cache_info_file = os.path.join(cache_dir, f'{url_hash}_info.json')
         
         # Save info
         try:
-            with open(cache_info_file, 'w') as f:
-                json.dump({
-                    'url': youtube_url,
-                    'video_path': video_path,
-                    'used_segments': used_segments
-                }, f, indent=2)
+            info = {
+                'url': youtube_url,
+                'video_path': video_path,
+                'used_bitmap': _encode_used_segments(used_segments),
+                'duration': duration,
+                'keyframes': keyframes
+            }
+            if orjson:
+                with open(cache_info_file, 'wb') as f:
+                    f.write(orjson.dumps(info))
+            else:
+                with open(cache_info_file, 'w') as f:
+                    json.dump(info, f, separators=(',', ':'))
         except Exception as e:
             logger.warning(f"Could not save cache info: {e}")
     
-    def _get_random_unused_segment(self, video_path: str, used_segments: List[int], segment_duration: int = 59) -> int:
+    def _probe_duration(self, video_path: str) -> Optional[float]:
         """
-        Get a RANDOM unused segment start time from a cached video.
+        Get a video's duration in seconds with ffprobe.
         
         Args:
             video_path: Path to video file
-            used_segments: List of start times (in seconds) that have been used
-            segment_duration: Duration of each segment in seconds (default: 60)
             
         Returns:
-            Start time in seconds for random unused segment, or 0 if all segments used
+            Duration in seconds, or None if it could not be read
         """
-        import subprocess
-        import random
+        info = _probe_media(video_path)
+        return info["duration"] if info else None
+    
+    def _probe_keyframes(self, video_path: str) -> Optional[List[float]]:
+        """
+        Get the keyframe (I-frame) timestamps of a video with ffprobe.
+        Only keyframes are read (-skip_frame nokey), so this is much cheaper than a full decode.
         
-        # Get video duration
+        Args:
+            video_path: Path to video file
+            
+        Returns:
+            Sorted keyframe timestamps in seconds, or None if they could not be read
+        """
         try:
             result = subprocess.run(
-                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', video_path],
+                [_FFPROBE_PATH, '-v', 'error', '-select_streams', 'v:0', '-skip_frame', 'nokey',
+                 '-show_entries', 'frame=pts_time', '-of', 'csv=p=0', video_path],
                 capture_output=True,
                 text=True,
-                timeout=10
+                timeout=120
             )
-            duration = float(result.stdout.strip())
+            keyframes = sorted(round(float(t), 3) for t in result.stdout.split() if t and t != 'N/A')
+            return keyframes or None
         except Exception as e:
-            logger.warning(f"Could not get video duration: {e}, using default")
-            duration = 3600  # Default to 1 hour
+            logger.warning(f"Could not get video keyframes: {e}")
+            return None
+    
+    def _get_random_unused_segment(self, video_path: str, used_segments: List[int], segment_duration: int = SEGMENT_DURATION,
+                                   duration: float = None) -> int:
+        """
+        Get a RANDOM unused segment start time from a cached video.
+        
+        Args:
+            video_path: Path to video file
+            used_segments: List of start times (in seconds) that have been used
+            segment_duration: Duration of each segment in seconds (default: 60)
+            duration: Known video duration in seconds (skips ffprobe when given)
+            
+        Returns:
+            Start time in seconds for random unused segment, or 0 if all segments used
+        """
+        # Get video duration
+        if duration is None:
+            duration = self._probe_duration(video_path)
+            if duration is None:
+                logger.warning("Using default video duration")
+                duration = 3600  # Default to 1 hour
         
         # Calculate available start window
         max_start = int(max(0, duration - segment_duration))
@@ -837,21 +1599,32 @@ class VideoGenerator:
             return 0
 
         # Choose start times in 5-second steps to reduce repeats while keeping them truly random.
-        step = 5
-        min_start = 15 if max_start >= 15 else 0  # avoid starting at 0 unless we have no choice
-        all_starts = list(range(min_start, max_start + 1, step))
-        if not all_starts:
-            all_starts = [0]
-
-        used_set = set(int(x) for x in (used_segments or []))
-        unused = [s for s in all_starts if s not in used_set]
-        if unused:
-            selected = random.choice(unused)
-            logger.info(f"  ✓ Selected RANDOM unused start: {selected}s (from {len(unused)} available)")
+        step = SEGMENT_STEP
+        min_start = SEGMENT_MIN_START if max_start >= SEGMENT_MIN_START else 0  # avoid starting at 0 unless we have no choice
+        slots = (max_start - min_start) // step + 1
+
+        # One byte per start slot: 1 = unused, 0 = used
+        free = bytearray(b'\x01') * slots
+        for used in used_segments or []:
+            offset = int(used) - min_start
+            if offset >= 0 and offset % step == 0 and offset // step < slots:
+                free[offset // step] = 0
+        available = free.count(1)
+
+        if available:
+            # Rejection-sample a free slot (cheap while most slots are free), then fall back to a scan
+            for _ in range(32):
+                idx = random.randrange(slots)
+                if free[idx]:
+                    break
+            else:
+                idx = random.choice([i for i in range(slots) if free[i]])
+            selected = min_start + idx * step
+            logger.info(f"  ✓ Selected RANDOM unused start: {selected}s (from {available} available)")
             return selected
 
         logger.warning("All start positions used, picking random start anyway")
-        return random.choice(all_starts)
+        return min_start + random.randrange(slots) * step
     
     def _get_minecraft_parkour_video_asset_id(self, topic: str, keywords: list = None) -> Optional[str]:
         """
@@ -878,15 +1651,19 @@ class VideoGenerator:
             cache_dir = os.path.join(os.getcwd(), 'video_cache')
             cached_videos = []
             if os.path.exists(cache_dir):
-                import json
-                import hashlib
-                for file in os.listdir(cache_dir):
-                    if not file.endswith('_info.json'):
-                        continue
+                with os.scandir(cache_dir) as it:
+                    info_entries = [e for e in it if e.name.endswith('_info.json') and e.is_file()]
+                for entry in info_entries:
                     try:
-                        info_path = os.path.join(cache_dir, file)
-                        with open(info_path, 'r') as f:
-                            info = json.load(f)
+                        info_path = entry.path
+                        # Only re-parse info files that changed since the last scan
+                        mtime = entry.stat().st_mtime
+                        cached_entry = self._cache_index.get(info_path)
+                        if cached_entry and cached_entry[0] == mtime:
+                            info = cached_entry[1]
+                        else:
+                            info = _read_info_json(info_path)
+                            self._cache_index[info_path] = (mtime, info)
                         # Only reuse cache entries that match our configured pot URL
                         if info.get('url', '') != BACKGROUND_POT_URL:
                             continue
@@ -895,7 +1672,7 @@ class VideoGenerator:
                             cached_videos.append({
                                 'url': info.get('url', ''),
                                 'path': video_path,
-                                'used_segments': info.get('used_segments', [])
+                                'used_segments': _decode_used_segments(info)
                             })
                     except Exception:
                         pass
@@ -915,7 +1692,7 @@ class VideoGenerator:
             else:
                 # No cached pot video yet - use the configured pot URL
                 logger.info("No cached pot video found yet, using configured background pot URL...")
-                youtube_url = self._get_minecraft_parkour_video_url(topic, keywords, self.youtube_service)
+                youtube_url = self._get_background_url()
                 if not youtube_url:
                     logger.warning("Could not get background pot URL")
                     return None
@@ -927,81 +1704,94 @@ class VideoGenerator:
                 logger.info(f"✓ Using cached video (no re-download needed)")
                 logger.info(f"  Cached video: {os.path.basename(cached_info['path'])}")
                 
-                # CRITICAL: Reload cache info fresh to get latest used_segments
-                cached_info = self._get_cached_video_info(youtube_url)
-                if not cached_info:
-                    logger.warning("Cache info disappeared, downloading new video")
-                    cached_info = None
-                else:
-                    # Get RANDOM unused segment
-                    used_segments = cached_info.get('used_segments', [])
-                    logger.info(f"  Previously used segments: {used_segments}")
-                    
-                    segment_start = self._get_random_unused_segment(
+                # cached_info was just read above, so used_segments is already current
+                # Get RANDOM unused segment
+                used_segments = list(cached_info.get('used_segments', []))
+                logger.info(f"  Previously used segments: {used_segments}")
+                
+                duration = cached_info.get('duration')
+                keyframes = cached_info.get('keyframes')
+                if duration is None or keyframes is None:
+                    # Older cache entries lack these - probe both at once and store them below
+                    with ThreadPoolExecutor(max_workers=2) as pool:
+                        duration_future = pool.submit(self._probe_duration, cached_info['path']) if duration is None else None
+                        keyframes_future = pool.submit(self._probe_keyframes, cached_info['path']) if keyframes is None else None
+                        if duration_future:
+                            duration = duration_future.result()
+                        if keyframes_future:
+                            keyframes = keyframes_future.result()
+                
+                segment_start = self._get_random_unused_segment(
+                    cached_info['path'],
+                    used_segments,
+                    segment_duration=SEGMENT_DURATION,
+                    duration=duration
+                )
+                
+                logger.info(f"  ✓ Selected RANDOM segment: {segment_start}s (will clip {segment_start}-{segment_start+60}s)")
+                
+                if STREAM_CLIP_UPLOAD:
+                    # Pipe ffmpeg's output straight into the upload (no clip file on disk)
+                    asset_id = self._upload_clip_streamed(
                         cached_info['path'],
-                        used_segments,
-                        segment_duration=59
+                        start=_snap_to_keyframe(segment_start, keyframes),
+                        duration=SEGMENT_DURATION
                     )
+                    if asset_id:
+                        used_segments = sorted(set(used_segments) | {segment_start})
+                        self._save_cached_video_info(youtube_url, cached_info['path'], used_segments,
+                                                     duration=duration, keyframes=keyframes)
+                        logger.info(f"  ✓ Saved cache: used_segments = {used_segments}")
+                        return asset_id
+                    logger.warning("Streamed upload failed, falling back to clipping to a file")
+                
+                # Clip the segment
+                temp_dir = tempfile.mkdtemp()
+                clipped_path = os.path.join(temp_dir, f'parkour_segment_{segment_start}s.mp4')
+                
+                # Clip and mute in a single ffmpeg pass (starting on a keyframe, so the copy is mux-only)
+                clipped = self._prepare_background(
+                    cached_info['path'],
+                    clipped_path,
+                    start=_snap_to_keyframe(segment_start, keyframes),
+                    duration=SEGMENT_DURATION,
+                    mute=True
+                )
+                
+                if not clipped:
+                    logger.warning("Could not clip cached video, downloading new one")
+                    cached_info = None  # Fall through to download
+                else:
+                    # Mark segment as used BEFORE uploading (so it's saved even if upload fails)
+                    # CRITICAL: Always update the cache, even if segment_start is already in list
+                    # This ensures the cache file is saved with current state
+                    if segment_start not in used_segments:
+                        used_segments.append(segment_start)
+                        logger.info(f"  ✓ Marking segment {segment_start}s as used (NEW)")
+                    else:
+                        logger.warning(f"  ⚠ Segment {segment_start}s already in used_segments list!")
                     
-                    logger.info(f"  ✓ Selected RANDOM segment: {segment_start}s (will clip {segment_start}-{segment_start+60}s)")
+                    # ALWAYS save the cache (even if segment was already marked)
+                    # Sort segments for consistency
+                    used_segments = sorted(list(set(used_segments)))  # Remove duplicates and sort
+                    self._save_cached_video_info(youtube_url, cached_info['path'], used_segments,
+                                                 duration=duration, keyframes=keyframes)
+                    logger.info(f"  ✓ Saved cache: used_segments = {used_segments}")
                     
-                    # Clip the segment
-                    temp_dir = tempfile.mkdtemp()
-                    clipped_path = os.path.join(temp_dir, f'parkour_segment_{segment_start}s.mp4')
+                    # Upload to HeyGen
+                    asset_id = self._upload_video_to_heygen(clipped_path)
                     
-                    clipped = self._trim_video(
-                        cached_info['path'],
-                        clipped_path,
-                        max_duration=59,
-                        start_time=segment_start
-                    )
+                    # Cleanup temp files (keep cached video)
+                    try:
+                        if os.path.exists(clipped_path):
+                            os.remove(clipped_path)
+                        if os.path.exists(temp_dir):
+                            os.rmdir(temp_dir)
+                    except:
+                        pass
                     
-                    if not clipped:
-                        logger.warning("Could not clip cached video, downloading new one")
-                        cached_info = None  # Fall through to download
-                    else:
-                        # Mark segment as used BEFORE uploading (so it's saved even if upload fails)
-                        # CRITICAL: Always update the cache, even if segment_start is already in list
-                        # This ensures the cache file is saved with current state
-                        if segment_start not in used_segments:
-                            used_segments.append(segment_start)
-                            logger.info(f"  ✓ Marking segment {segment_start}s as used (NEW)")
-                        else:
-                            logger.warning(f"  ⚠ Segment {segment_start}s already in used_segments list!")
-                        
-                        # ALWAYS save the cache (even if segment was already marked)
-                        # Sort segments for consistency
-                        used_segments = sorted(list(set(used_segments)))  # Remove duplicates and sort
-                        self._save_cached_video_info(youtube_url, cached_info['path'], used_segments)
-                        logger.info(f"  ✓ Saved cache: used_segments = {used_segments}")
-                        
-                        # Mute audio
-                        logger.info("Muting audio from background video...")
-                        muted_path = clipped_path.replace('.mp4', '_muted.mp4')
-                        muted_video = self._convert_to_mp4(clipped_path, muted_path, mute_audio=True)
-                        if muted_video:
-                            downloaded_path = muted_video
-                            logger.info("✓ Background video audio muted")
-                        else:
-                            downloaded_path = clipped_path
-                            logger.warning("Could not mute audio, will use original video")
-                        
-                        # Upload to HeyGen
-                        asset_id = self._upload_video_to_heygen(downloaded_path)
-                        
-                        # Cleanup temp files (keep cached video)
-                        try:
-                            if os.path.exists(clipped_path) and clipped_path != downloaded_path:
-                                os.remove(clipped_path)
-                            if os.path.exists(muted_path) and muted_path != downloaded_path:
-                                os.remove(muted_path)
-                            if os.path.exists(temp_dir):
-                                os.rmdir(temp_dir)
-                        except:
-                            pass
-                        
-                        return asset_id
-            
+                    return asset_id
+        
             # Step 3: Download video (not cached or cache failed)
             if not cached_info:
                 logger.info("Downloading new Minecraft parkour video...")
@@ -1011,28 +1801,32 @@ class VideoGenerator:
                 os.makedirs(cache_dir, exist_ok=True)
                 
                 # Create cache filename
-                import hashlib
-                url_hash = hashlib.md5(youtube_url.encode()).hexdigest()
+                url_hash = _url_cache_key(youtube_url)
                 cache_video_path = os.path.join(cache_dir, f'{url_hash}.mp4')
                 
                 # CRITICAL: Download FULL video to cache (don't trim it!)
                 # We'll trim segments later when needed
-                downloaded_path = self._download_youtube_video(youtube_url, cache_video_path)
+                downloaded_path, duration = self._download_youtube_video(youtube_url, cache_video_path)
                 if not downloaded_path:
-                    logger.warning("Failed to download YouTube video")
-                    return None
+                    # Fall back to pulling just one segment from the stream (not cached)
+                    logger.warning("Failed to download YouTube video, trying to stream a single segment...")
+                    temp_dir = tempfile.mkdtemp()
+                    segment_path = self._stream_youtube_segment(
+                        youtube_url, os.path.join(temp_dir, 'parkour_segment.mp4'), duration=SEGMENT_DURATION
+                    )
+                    if not segment_path:
+                        shutil.rmtree(temp_dir, ignore_errors=True)
+                        return None
+                    asset_id = self._upload_video_to_heygen(segment_path)
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                    return asset_id
         
                 # Verify we have a full video (not trimmed to 60s)
-                import subprocess
-                try:
-                    result = subprocess.run(
-                        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-                         '-of', 'default=noprint_wrappers=1:nokey=1', downloaded_path],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    duration = float(result.stdout.strip())
+                # The duration comes from the yt-dlp metadata (ffprobe only if it was missing) and is
+                # reused for segment selection and saved in the cache info
+                if duration is None:
+                    duration = self._probe_duration(downloaded_path)
+                if duration is not None:
                     logger.info(f"  Cached video duration: {duration:.1f}s")
                     if duration <= 65:  # If video is ~60 seconds, it was trimmed
                         logger.error(f"❌ PROBLEM: Cached video is only {duration:.1f}s!")
@@ -1045,80 +1839,82 @@ class VideoGenerator:
                         except:
                             pass
                         # Re-download without trimming
-                        downloaded_path = self._download_youtube_video(youtube_url, cache_video_path)
-                        if downloaded_path:
-                            result = subprocess.run(
-                                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-                                 '-of', 'default=noprint_wrappers=1:nokey=1', downloaded_path],
-                                capture_output=True,
-                                text=True,
-                                timeout=10
-                            )
-                            duration = float(result.stdout.strip())
+                        downloaded_path, duration = self._download_youtube_video(youtube_url, cache_video_path)
+                        if not downloaded_path:
+                            logger.warning("Failed to re-download YouTube video")
+                            return None
+                        if duration is None:
+                            duration = self._probe_duration(downloaded_path)
+                        if duration is not None:
                             logger.info(f"  ✓ Re-downloaded full video: {duration:.1f}s")
-                except Exception as e:
-                    logger.warning(f"Could not verify video duration: {e}")
-                
-                # Get video duration for random segment selection
-                import subprocess
-                try:
-                    result = subprocess.run(
-                        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-                         '-of', 'default=noprint_wrappers=1:nokey=1', downloaded_path],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    video_duration = float(result.stdout.strip())
-                except Exception as e:
-                    logger.warning(f"Could not get video duration for random segment: {e}")
-                    video_duration = 600  # Default to 10 minutes
+                else:
+                    logger.warning("Could not verify video duration")
                 
-                # Pick a RANDOM segment start time (not always 0!)
-                import random
                 # Pick a truly RANDOM start time (in 5-second steps, avoids 0 when possible)
-                segment_start = self._get_random_unused_segment(downloaded_path, used_segments=[], segment_duration=59)
+                segment_start = self._get_random_unused_segment(
+                    downloaded_path, used_segments=[], segment_duration=SEGMENT_DURATION,
+                    duration=duration or 600  # Default to 10 minutes
+                )
                 
                 logger.info(f"  ✓ Selected RANDOM segment for new video: {segment_start}s")
                 
                 # Save cache info (mark this segment as used)
-                self._save_cached_video_info(youtube_url, downloaded_path, [segment_start])
+                pot_path = downloaded_path
+                self._save_cached_video_info(youtube_url, pot_path, [segment_start], duration=duration)
+                
+                # Keyframes only matter for later clips, so probe them while this one is cut and uploaded
+                probe_pool = ThreadPoolExecutor(max_workers=1)
+                keyframes_future = probe_pool.submit(self._probe_keyframes, pot_path)
                 
                 # Clip RANDOM 59-second segment FROM THE FULL VIDEO for this use (must be < 1 minute)
                 temp_dir = tempfile.mkdtemp()
                 clipped_path = os.path.join(temp_dir, f'parkour_segment_{segment_start}s.mp4')
                 
-                clipped = self._trim_video(
+                # Clip and mute in a single ffmpeg pass
+                clipped = self._prepare_background(
                     downloaded_path,  # Use FULL video, not trimmed version
                     clipped_path,
-                    max_duration=59,
-                    start_time=segment_start  # Use RANDOM start time, not 0!
+                    start=segment_start,  # Use RANDOM start time, not 0!
+                    duration=SEGMENT_DURATION,
+                    mute=True
                 )
                 
-                if not clipped:
-                    logger.warning("Could not clip video, using full video")
-                    clipped_path = downloaded_path
-                
-                # Mute audio from background video
-                logger.info("Muting audio from background video...")
                 muted_path = clipped_path.replace('.mp4', '_muted.mp4')
-                muted_video = self._convert_to_mp4(clipped_path, muted_path, mute_audio=True)
-                if muted_video:
-                    downloaded_path = muted_video
-                    logger.info("✓ Background video audio muted")
-                else:
+                if clipped:
                     downloaded_path = clipped_path
-                    logger.warning("Could not mute audio, will use original video")
+                else:
+                    logger.warning("Could not clip video, using full video")
+                    clipped_path = downloaded_path
+                    
+                    # Mute audio from background video
+                    logger.info("Muting audio from background video...")
+                    muted_path = clipped_path.replace('.mp4', '_muted.mp4')
+                    muted_video = self._convert_to_mp4(clipped_path, muted_path, mute_audio=True)
+                    if muted_video:
+                        downloaded_path = muted_video
+                        logger.info("✓ Background video audio muted")
+                    else:
+                        downloaded_path = clipped_path
+                        logger.warning("Could not mute audio, will use original video")
                 
                 # Upload to HeyGen
                 asset_id = self._upload_video_to_heygen(downloaded_path)
                 
+                keyframes = keyframes_future.result()
+                probe_pool.shutdown()
+                if keyframes:
+                    self._save_cached_video_info(youtube_url, pot_path, [segment_start],
+                                                 duration=duration, keyframes=keyframes)
+                
                 # Cleanup temp files (keep cached video)
                 try:
-                    if os.path.exists(clipped_path) and clipped_path != downloaded_path and clipped_path != cache_video_path:
-                        os.remove(clipped_path)
-                    if os.path.exists(muted_path) and muted_path != downloaded_path:
-                        os.remove(muted_path)
+                    for temp_path in (clipped_path, muted_path):
+                        # pot_path may differ from cache_video_path (e.g. a _trimmed.mp4 kept when
+                        # the rename failed); it is the cached full video either way
+                        if temp_path not in (pot_path, cache_video_path) and os.path.exists(temp_path):
+                            os.remove(temp_path)
+                    if os.path.exists(temp_dir):
+                        os.rmdir(temp_dir)
                 except:
                     pass
                 
@@ -1126,10 +1922,39 @@ class VideoGenerator:
             
         except Exception as e:
             logger.error(f"Error getting Minecraft parkour video asset: {e}")
-            import traceback
             logger.debug(traceback.format_exc())
         return None
     
+    def _post_with_backoff(self, url: str, payload: Dict, max_retries: int = 3) -> requests.Response:
+        """
+        POST JSON to HeyGen, retrying rate limits (429), server errors (5xx) and
+        connection errors/timeouts with jittered exponential backoff.
+        
+        Args:
+            url: Endpoint URL
+            payload: JSON body
+            max_retries: Retries after the first attempt
+            
+        Returns:
+            The last response (other 4xx responses are returned immediately for the caller to handle)
+        """
+        # Serialize once for all attempts (the session already sends Content-Type: application/json)
+        body = orjson.dumps(payload) if orjson else json.dumps(payload, separators=(',', ':')).encode()
+        for attempt in range(max_retries + 1):
+            if attempt:
+                delay = _backoff_delay(attempt - 1)
+                logger.info(f"Attempt {attempt} failed, sleeping {delay:.1f}s")
+                time.sleep(delay)
+            try:
+                response = self._session.post(url, data=body, timeout=30)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == max_retries:
+                    raise
+                continue
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+        return response
+    
     def create_video(self, script: str, avatar_id: str = None, voice_id: str = None, 
                      background_image_url: str = None, background_video_url: str = None,
                      video_asset_id: str = None) -> Optional[str]:
@@ -1218,11 +2043,11 @@ class VideoGenerator:
                 logger.warning(f"⚠ Script might be too long (estimated ~{estimated_duration:.1f}s)")
                 logger.warning("   Free plan limit is 180 seconds. Consider shortening the script.")
             
-            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+            response = self._post_with_backoff(url, payload)
             
             if response.status_code == 200:
                 result = response.json()
-                video_id = result.get("data", {}).get("video_id") or result.get("video_id") or result.get("data", {}).get("id") or result.get("id")
+                video_id = _dig(result, _VIDEO_ID_PATHS)
                 if video_id:
                     logger.info(f"✓ Video creation started! Video ID: {video_id}")
                     return video_id
@@ -1237,8 +2062,8 @@ class VideoGenerator:
                     error_message = error_data.get("message", "").lower()
                     error_detail = error_data.get("detail", "").lower()
                     
-                    logger.debug(f"Error message: {error_message}")
-                    logger.debug(f"Error detail: {error_detail}")
+                    logger.debug("Error message: %s", error_message)
+                    logger.debug("Error detail: %s", error_detail)
                     
                     # Check if voice is not found - retry with different voice
                     voice_not_found = (
@@ -1251,76 +2076,59 @@ class VideoGenerator:
                         logger.warning(f"Voice ID {voice_id} not found, retrying with different voice...")
                         # Get a new random voice and retry (max 3 attempts)
                         max_voice_retries = 3
+                        
+                        # Refresh the voice list once (the failing voice may be stale in the cache);
+                        # the list and its English subset are then reused for every retry
+                        self._voices = None  # Clear cache
+                        self._english_voices = None
+                        self._english_voice_index = None
+                        voices = self._get_voices(refresh=True)
+                        english_voices = self._get_english_voices() if voices else []
+                        tried_voice_ids = {voice_id}
+                        
                         for retry_attempt in range(max_voice_retries):
-                            # Get fresh voices list
-                            self._voices = None  # Clear cache
-                            voices = self._get_voices()
                             if not voices:
                                 logger.error("No voices available for retry")
                                 break
                             
-                            # Filter for English voices
-                            english_voices = []
-                            for v in voices:
-                                v_name = v.get('name', '').lower()
-                                v_lang = v.get('language', '').lower()
-                                is_english = (
-                                    'en' in v_lang or 'english' in v_lang or
-                                    'en' in v_name or 'english' in v_name or
-                                    'us' in v_lang or 'uk' in v_lang
-                                )
-                                non_english = any(ind in v_lang or ind in v_name 
-                                                for ind in ['hi', 'hindi', 'es', 'spanish', 'fr', 'french'])
-                                if is_english and not non_english:
-                                    english_voices.append(v)
-                            
-                            # Select new voice
+                            # Select new voice (prefer English, skip voices that already failed)
+                            pool = english_voices or voices
+                            candidates = [v for v in pool if (v.get("voice_id") or v.get("id")) not in tried_voice_ids] or pool
+                            new_voice = random.choice(candidates)
+                            new_voice_id = new_voice.get("voice_id") or new_voice.get("id")
+                            tried_voice_ids.add(new_voice_id)
                             if english_voices:
-                                import random
-                                new_voice = random.choice(english_voices)
-                                new_voice_id = new_voice.get("voice_id") or new_voice.get("id")
                                 logger.info(f"Retry {retry_attempt + 1}/{max_voice_retries}: Using voice {new_voice.get('name', 'Unknown')} (ID: {new_voice_id})")
                             else:
-                                import random
-                                new_voice = random.choice(voices)
-                                new_voice_id = new_voice.get("voice_id") or new_voice.get("id")
                                 logger.warning(f"Retry {retry_attempt + 1}/{max_voice_retries}: No English voices, using {new_voice.get('name', 'Unknown')} (ID: {new_voice_id})")
                             
-                            # Update voice_id in payload
+                            # Update voice_id in payload (video_input is payload["video_inputs"][0])
                             video_input["voice"]["voice_id"] = new_voice_id
-                            payload["video_inputs"] = [video_input]
                             
-                            # Retry request
-                            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+                            # Retry request (_post_with_backoff handles backoff for 429/5xx/connection errors;
+                            # a voice-not-found 400 is retried at once with a different voice)
+                            response = self._post_with_backoff(url, payload)
                             if response.status_code == 200:
                                 result = response.json()
-                                video_id = result.get("data", {}).get("video_id") or result.get("video_id") or result.get("data", {}).get("id") or result.get("id")
+                                video_id = _dig(result, _VIDEO_ID_PATHS)
                                 if video_id:
                                     logger.info(f"✓ Video creation started with new voice! Video ID: {video_id}")
                                     return video_id
                             elif response.status_code == 400:
-                                # Check if it's still a voice error
-                                try:
-                                    retry_error = response.json()
-                                    retry_error_msg = retry_error.get("message", "").lower()
-                                    if "voice" not in retry_error_msg or "not found" not in retry_error_msg:
-                                        # Different error, break and handle normally
-                                        break
-                                except:
+                                # Check if it's still a voice error (body parsed once, only if it is JSON)
+                                retry_body = _json_body(response)
+                                retry_error_msg = str(retry_body.get("message", "")).lower()
+                                if "voice" not in retry_error_msg or "not found" not in retry_error_msg:
+                                    # Different error, break and handle normally
                                     break
                         
                         # If all retries failed, log error and continue to other error handling
                         logger.error(f"Failed to find valid voice after {max_voice_retries} retries")
                     
                     # Check if video background has issues
-                    video_bg_error = (
-                        ("video" in error_message and "background" in error_message) or 
-                        ("play_style" in error_message) or 
-                        ("video_asset_id" in error_message) or
-                        ("either url or video_asset_id" in error_message)
-                    )
+                    video_bg_error = _VIDEO_BG_ERROR_RE.search(error_message) is not None
                     
-                    logger.debug(f"Video background error detected: {video_bg_error}")
+                    logger.debug("Video background error detected: %s", video_bg_error)
                     
                     if video_bg_error:
                         logger.warning("Video background error, falling back to image")
@@ -1335,13 +2143,12 @@ class VideoGenerator:
                                 "type": "image",
                                 "url": background_image_url
                             }
-                            payload["video_inputs"] = [video_input]
                             logger.info(f"Retrying with image background: {background_image_url[:80]}...")
                             # Retry the request
-                            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+                            response = self._post_with_backoff(url, payload)
                             if response.status_code == 200:
                                 result = response.json()
-                                video_id = result.get("data", {}).get("video_id") or result.get("video_id") or result.get("data", {}).get("id") or result.get("id")
+                                video_id = _dig(result, _VIDEO_ID_PATHS)
                                 if video_id:
                                     logger.info(f"✓ Video creation started! Video ID: {video_id}")
                                     return video_id
@@ -1351,52 +2158,21 @@ class VideoGenerator:
                                 "type": "color",
                                 "value": "#1a1a1a"
                             }
-                            payload["video_inputs"] = [video_input]
                             logger.info("Retrying with color background")
-                            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+                            response = self._post_with_backoff(url, payload)
                             if response.status_code == 200:
                                 result = response.json()
-                                video_id = result.get("data", {}).get("video_id") or result.get("video_id") or result.get("data", {}).get("id") or result.get("id")
+                                video_id = _dig(result, _VIDEO_ID_PATHS)
                                 if video_id:
                                     logger.info(f"✓ Video creation started! Video ID: {video_id}")
                                     return video_id
                     
-                    if error_code == "RESOLUTION_NOT_ALLOWED":
-                        logger.error("✗ Resolution not allowed for your plan")
-                        logger.error(f"   Error: {error_data.get('message', 'Unknown error')}")
-                        logger.error(f"   Detail: {error_data.get('detail', '')}")
-                        logger.error("\n   Current resolution: 720x1280 (720p vertical)")
-                        logger.error("   Free plan supports: 720p maximum")
-                        logger.error("   Please upgrade your HeyGen plan for higher resolutions")
-                        return None
-                    elif error_code == "MOVIO_VIDEO_IS_TOO_LONG":
-                        logger.error("✗ Video is too long (> 180 seconds)")
-                        logger.error(f"   Error: {error_data.get('message', 'Unknown error')}")
-                        logger.error(f"   Detail: {error_data.get('detail', '')}")
-                        logger.error(f"\n   Script length: {len(script)} characters")
-                        word_count = len(script.split())
-                        logger.error(f"   Script word count: {word_count} words")
-                        logger.error("\n   HeyGen Free Plan Limit:")
-                        logger.error("   - Maximum video length: 180 seconds (3 minutes)")
-                        logger.error("   - Your script is too long for the free plan")
-                        logger.error("\n   Solutions:")
-                        logger.error("   1. Shorten your script to ~30-40 words (15-20 seconds)")
-                        logger.error("   2. Upgrade your HeyGen plan for longer videos")
-                        logger.error("   3. Split the content into multiple shorter videos")
-                        return None
-                    elif error_code == "MOVIO_PAYMENT_INSUFFICIENT_CREDIT":
-                        logger.error("✗ Insufficient credits for video generation")
-                        logger.error(f"   Error: {error_data.get('message', 'Unknown error')}")
-                        logger.error(f"   Detail: {error_data.get('detail', '')}")
-                        logger.error("\n   HeyGen Credit System:")
-                        logger.error("   - Photo Avatar: 1 credit per minute (30-second increments)")
-                        logger.error("   - Video Avatar: 2 credits per minute (30-second increments)")
-                        logger.error("   - A 30-second video typically costs 1 credit")
-                        logger.error("\n   Troubleshooting:")
-                        logger.error("   1. Check your HeyGen dashboard for accurate credit balance")
-                        logger.error("   2. Credits may be reserved/held for pending jobs")
-                        logger.error("   3. Wait for pending jobs to complete and credits to be released")
-                        logger.error("   4. Ensure you have at least 1 credit available")
+                    extra = ""
+                    if error_code == "MOVIO_VIDEO_IS_TOO_LONG":
+                        extra = (f"\n\n   Script length: {len(script)} characters"
+                                 f"\n   Script word count: {len(script.split())} words")
+                    if _log_heygen_error(error_code, error_data.get('message', 'Unknown error'),
+                                         error_data.get('detail', ''), extra):
                         return None
                 except Exception as parse_error:
                     logger.error(f"Error parsing HeyGen API response: {parse_error}")
@@ -1407,7 +2183,6 @@ class VideoGenerator:
         
         except Exception as e:
             logger.error(f"Error creating video: {e}")
-            import traceback
             logger.debug(traceback.format_exc())
         return None
     
@@ -1425,12 +2200,12 @@ class VideoGenerator:
         
         try:
             params = {"video_id": video_id}
-            response = requests.get(url, params=params, headers=self.headers, timeout=30)
+            response = self._session.get(url, params=params, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
                 data = result.get("data", {}) or result
-                logger.debug(f"Video {video_id} status: {data.get('status', 'unknown')}")
+                logger.debug("Video %s status: %s", video_id, data.get('status', 'unknown'))
                 return data
             else:
                 logger.error(f"Error checking video status: {response.status_code}")
@@ -1451,16 +2226,17 @@ class VideoGenerator:
             Video URL if successful, None otherwise
         """
         timeout = timeout or VIDEO_GENERATION_TIMEOUT
-        start_time = time.time()
-        check_interval = 10  # Check every 10 seconds
+        start_time = time.monotonic()
+        check_interval = POLL_INTERVAL_START
+        last_progress_log = 0
         last_status = None
         
         logger.info(f"Waiting for video generation (timeout: {timeout}s / {timeout//60} minutes)...")
         logger.info(f"Video ID: {video_id}")
         logger.info("Note: HeyGen videos can take 2-10 minutes depending on queue and video length")
         
-        while time.time() - start_time < timeout:
-            elapsed = int(time.time() - start_time)
+        while time.monotonic() - start_time < timeout:
+            elapsed = int(time.monotonic() - start_time)
             
             # Check video status
             status_data = self.check_video_status(video_id)
@@ -1470,9 +2246,10 @@ class VideoGenerator:
             if status != last_status:
                 logger.info(f"Status changed: {last_status or 'starting'} → {status}")
                 last_status = status
+                check_interval = POLL_INTERVAL_START  # Job is moving - check again soon
             
-            if status == "completed":
-                video_url = status_data.get("video_url") or status_data.get("url") or status_data.get("download_url")
+            if status == _STATUS_COMPLETED:
+                video_url = _dig(status_data, _VIDEO_URL_PATHS)
                 if video_url:
                     logger.info(f"✓ Video ready! URL: {video_url}")
                     return video_url
@@ -1480,38 +2257,14 @@ class VideoGenerator:
                     logger.error("Video completed but no URL found")
                 return None
                     
-            elif status in ["failed", "error"]:
+            elif status in _STATUS_FAILED:
                 error_info = status_data.get("error", {})
                 if isinstance(error_info, dict):
                     error_code = error_info.get("code", "")
                     error_message = error_info.get("message", "")
                     error_detail = error_info.get("detail", "")
                     
-                    if error_code == "MOVIO_VIDEO_IS_TOO_LONG":
-                        logger.error("✗ Video is too long (> 180 seconds)")
-                        logger.error(f"   Error: {error_message}")
-                        logger.error(f"   Detail: {error_detail}")
-                        logger.error("\n   HeyGen Free Plan Limit:")
-                        logger.error("   - Maximum video length: 180 seconds (3 minutes)")
-                        logger.error("   - Your script was too long for the free plan")
-                        logger.error("\n   Solutions:")
-                        logger.error("   1. Shorten your script to ~30-40 words (15-20 seconds)")
-                        logger.error("   2. Upgrade your HeyGen plan for longer videos")
-                        logger.error("   3. Split the content into multiple shorter videos")
-                        return None
-                    elif error_code == "MOVIO_PAYMENT_INSUFFICIENT_CREDIT":
-                        logger.error("✗ Insufficient credits for video generation")
-                        logger.error(f"   Error: {error_message}")
-                        logger.error(f"   Detail: {error_detail}")
-                        logger.error("\n   HeyGen Credit System:")
-                        logger.error("   - Photo Avatar: 1 credit per minute (30-second increments)")
-                        logger.error("   - Video Avatar: 2 credits per minute (30-second increments)")
-                        logger.error("   - A 30-second video typically costs 1 credit")
-                        logger.error("\n   Possible reasons:")
-                        logger.error("   1. Credits may be reserved/held for pending jobs")
-                        logger.error("   2. Minimum credit threshold may be required")
-                        logger.error("   3. Check your HeyGen dashboard for accurate balance")
-                        logger.error("   4. Credits may have been consumed by other operations")
+                    if _log_heygen_error(error_code, error_message, error_detail):
                         return None
                     else:
                         logger.error(f"Video generation failed: {error_code} - {error_message}")
@@ -1523,20 +2276,23 @@ class VideoGenerator:
                 return None
             
             # Log progress every 30 seconds
-            if elapsed > 0 and elapsed % 30 == 0:
+            if elapsed - last_progress_log >= 30:
+                last_progress_log = elapsed
                 minutes = elapsed // 60
                 seconds = elapsed % 60
                 logger.info(f"Still processing... ({minutes}m {seconds}s elapsed, status: {status})")
             
-            time.sleep(check_interval)
+            # Back off between checks: quick renders are noticed early, long ones poll less often
+            time.sleep(check_interval + random.uniform(0, 0.5))
+            check_interval = min(check_interval * 1.5, MAX_POLL_INTERVAL)
         
         # Timeout - check one more time
         logger.warning(f"Timeout after {timeout}s - checking status one more time...")
         status_data = self.check_video_status(video_id)
         status = status_data.get("status", "unknown").lower()
         
-        if status == "completed":
-            video_url = status_data.get("video_url") or status_data.get("url") or status_data.get("download_url")
+        if status == _STATUS_COMPLETED:
+            video_url = _dig(status_data, _VIDEO_URL_PATHS)
             if video_url:
                 logger.info(f"✓ Video completed! URL: {video_url}")
                 return video_url
@@ -1545,6 +2301,50 @@ class VideoGenerator:
         logger.info(f"You can check status later using video ID: {video_id}")
         return None
     
+    @staticmethod
+    def _write_stream(response: requests.Response, output_path: str, total_size: int) -> int:
+        """Pipe a streamed response to disk in 1 MiB blocks, logging progress at most every 2s. Returns bytes written."""
+        response.raw.decode_content = True
+        reader = _ProgressReader(response.raw, total_size)
+        with open(output_path, 'wb') as f:
+            shutil.copyfileobj(reader, f, length=DOWNLOAD_CHUNK_SIZE)
+        return reader.bytes_read
+    
+    @staticmethod
+    def _download_ranged(video_url: str, output_path: str, response: requests.Response,
+                         total_size: int) -> bool:
+        """
+        Download a file as DOWNLOAD_RANGE_PARTS byte ranges in parallel.
+        
+        The already-open response supplies the first range; the others are fetched
+        with Range requests on worker threads, each writing at its own file offset.
+        
+        Args:
+            video_url: URL to download video from
+            output_path: Local path to save video
+            response: Open streamed GET response for video_url
+            total_size: Content-Length of the file
+            
+        Returns:
+            True if every range was written, False if the caller should retry as one stream
+        """
+        part_size = -(-total_size // DOWNLOAD_RANGE_PARTS)
+        ranges = [(lo, min(lo + part_size, total_size) - 1) for lo in range(0, total_size, part_size)]
+        logger.info(f"Downloading in {len(ranges)} parallel ranges")
+        try:
+            with open(output_path, 'wb') as f:
+                f.truncate(total_size)
+            with ThreadPoolExecutor(max_workers=len(ranges) - 1) as pool:
+                futures = [pool.submit(_fetch_range, video_url, output_path, lo, hi) for lo, hi in ranges[1:]]
+                with open(output_path, 'r+b') as f:
+                    _copy_bytes(response.raw, f, ranges[0][1] + 1)
+                for future in futures:
+                    future.result()
+            return True
+        except Exception as e:
+            logger.warning(f"Ranged download failed ({e}), retrying as a single stream")
+            return False
+    
     def download_video(self, video_url: str, output_path: str) -> bool:
         """
         Download video from URL to local file.
@@ -1558,23 +2358,30 @@ class VideoGenerator:
         """
         try:
             logger.info(f"Downloading video from: {video_url[:80]}...")
-            response = requests.get(video_url, timeout=300, stream=True)
-            response.raise_for_status()
+            # Plain request: the video URL is a CDN link, so don't send the HeyGen API key with it
+            with requests.get(video_url, timeout=300, stream=True) as response:
+                response.raise_for_status()
+                
+                total_size = int(response.headers.get('content-length', 0))
+                if total_size:
+                    logger.info(f"Download size: {total_size / 1024 / 1024:.2f} MB")
+                
+                # Large files from a CDN that serves byte ranges are fetched as parallel ranges;
+                # compressed bodies are excluded since ranges would address the encoded bytes
+                ranged = (total_size >= DOWNLOAD_RANGE_MIN_SIZE
+                          and response.headers.get('accept-ranges', '').lower() == 'bytes'
+                          and not response.headers.get('content-encoding'))
+                if ranged:
+                    file_size = total_size if self._download_ranged(video_url, output_path, response, total_size) else None
+                else:
+                    file_size = self._write_stream(response, output_path, total_size)
             
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
+            if file_size is None:
+                # A range failed part-way - start over on a single stream
+                with requests.get(video_url, timeout=300, stream=True) as response:
+                    response.raise_for_status()
+                    file_size = self._write_stream(response, output_path, total_size)
             
-            # Write to file
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total_size > 0 and downloaded % (1024 * 1024) == 0:  # Log every MB
-                            percent = (downloaded / total_size) * 100
-                            logger.info(f"Download progress: {percent:.1f}% ({downloaded}/{total_size} bytes)")
-            
-            file_size = os.path.getsize(output_path)
             logger.info(f"✓ Video downloaded successfully to: {output_path}")
             logger.info(f"File size: {file_size / 1024 / 1024:.2f} MB")
             return True
@@ -1636,79 +2443,102 @@ class VideoGenerator:
             logger.error(f"Could not retrieve video URL for video {video_id}")
             return None
         
-        # Download video
+        # Download video, then caption + add background audio
         if self.download_video(video_url, output_path):
-            # Add captions to the video using standalone script
-            logger.info("\n" + "="*60)
-            logger.info("Step 5: Adding captions to video...")
-            logger.info("="*60)
-            
-            captioned_path = self._add_captions_via_script(
-                output_path,
-                script=script
-            )
-            
-            if captioned_path:
-                logger.info(f"✓ Captioned video saved: {captioned_path}")
-                
-                # Step 6: Add background audio overlay
-                audio_path = self._add_background_audio(captioned_path)
-                if audio_path:
-                    logger.info(f"✓ Background audio added: {audio_path}")
-                    # Update captioned_path to use the audio version
-                    captioned_path = audio_path
-                
-                # Replace original with final version (captioned + audio)
-                try:
-                    os.remove(output_path)
-                    os.rename(captioned_path, output_path)
-                    logger.info(f"✓ Replaced original with final version (captions + audio)")
-                except Exception as e:
-                    logger.warning(f"Could not replace original: {e}, keeping both files")
-                    return captioned_path
-
-                # HARD CAP: ensure final output is always < 60 seconds
-                capped = self._ensure_under_duration(output_path, max_duration=59)
-                return capped or output_path
-                return output_path
-            else:
-                logger.warning("Captioning failed, using original video without captions")
-            return output_path
+            return self._finalize_video(output_path, script)
         
         return None
     
-    def _add_captions_via_script(self, video_path: str, script: str = None) -> Optional[str]:
+    def _finalize_video(self, output_path: str, script: str = None) -> str:
         """
-        Add captions using standalone caption_video.py script.
-        This isolates captioning from the main process to avoid PyTorch issues.
+        Post-process a downloaded video: captions, background audio and the duration cap.
+        
+        Args:
+            output_path: Downloaded HeyGen video; replaced in place with the final version
+            script: Script text used to help Whisper with the captions
+            
+        Returns:
+            Path to the final video (output_path unless the final file couldn't be moved there)
         """
-        import subprocess
-        import sys
+        # Add captions to the video using standalone script
+        logger.info("\n" + "="*60)
+        logger.info("Step 5: Adding captions to video...")
+        logger.info("="*60)
+        
+        captioned_path = self._add_captions_via_script(
+            output_path,
+            script=script
+        )
         
-        # First, ensure PyTorch and NumPy are installed correctly
+        if captioned_path:
+            logger.info(f"✓ Captioned video saved: {captioned_path}")
+            
+            # Step 6: Add background audio overlay (its -t also applies the duration cap)
+            audio_path = self._add_background_audio(captioned_path, max_duration=FINAL_MAX_DURATION)
+            duration_ok = audio_path is not None
+            if audio_path:
+                logger.info(f"✓ Background audio added: {audio_path}")
+                # Update captioned_path to use the audio version
+                captioned_path = audio_path
+            
+            # Replace original with final version (captioned + audio)
+            try:
+                os.replace(captioned_path, output_path)
+                logger.info(f"✓ Replaced original with final version (captions + audio)")
+            except Exception as e:
+                logger.warning(f"Could not replace original: {e}, keeping both files")
+                return captioned_path
+
+            # HARD CAP: ensure final output is always < 60 seconds
+            if duration_ok:
+                return output_path
+            try:
+                capped = self._ensure_under_duration(output_path, max_duration=FINAL_MAX_DURATION)
+            except Exception as e:
+                logger.warning(f"Could not enforce duration cap: {e}, keeping uncapped video")
+                capped = None
+            return capped or output_path
+        else:
+            logger.warning("Captioning failed, using original video without captions")
+        return output_path
+    
+    def _probe_caption_deps(self) -> bool:
+        """
+        Ensure PyTorch and NumPy import cleanly, reinstalling them if needed.
+        
+        Returns:
+            True if both NumPy and PyTorch are usable
+        """
         logger.info("Checking PyTorch and NumPy installation...")
         torch_ok = False
         numpy_ok = False
         
-        # Check NumPy first (required by PyTorch)
+        # Check NumPy first (required by PyTorch); skip the probe if it is already loaded
         try:
-            import numpy
+            if "numpy" not in sys.modules:
+                import numpy
             numpy_ok = True
             logger.debug("NumPy is available")
         except Exception as e:
             logger.warning(f"NumPy not available: {e}, installing...")
             try:
                 subprocess.run([sys.executable, "-m", "pip", "install", "numpy", "--no-cache-dir"], 
-                             capture_output=True, timeout=120, check=False)
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120, check=False)
                 import numpy
                 numpy_ok = True
                 logger.info("NumPy installed")
             except Exception as fix_error:
                 logger.error(f"Could not install NumPy: {fix_error}")
         
-        # Check PyTorch
+        # faster-whisper transcribes with CTranslate2 - PyTorch is only needed by openai-whisper
+        if importlib.util.find_spec("faster_whisper") is not None:
+            logger.debug("faster-whisper is available, skipping PyTorch check")
+            return numpy_ok
+        
+        # Check PyTorch (already imported in this process means it works)
         try:
-            import torch
+            if "torch" not in sys.modules:
+                import torch
             torch_ok = True
             logger.debug("PyTorch is available")
         except Exception as e:
@@ -1718,25 +2548,24 @@ class VideoGenerator:
                 try:
                     # Uninstall torch and related packages
                     subprocess.run([sys.executable, "-m", "pip", "uninstall", "torch", "torchvision", "torchaudio", "-y"], 
-                                 capture_output=True, timeout=60, check=False)
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60, check=False)
                     # Also uninstall tiktoken if it has architecture issues
                     subprocess.run([sys.executable, "-m", "pip", "uninstall", "tiktoken", "-y"], 
-                                 capture_output=True, timeout=30, check=False)
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30, check=False)
                     
                     # Install torch for ARM64 Mac (Apple Silicon)
-                    import platform
                     if platform.machine() == "arm64":
                         logger.info("Installing PyTorch for ARM64 (Apple Silicon)...")
                         subprocess.run([sys.executable, "-m", "pip", "install", "torch", "torchvision", "torchaudio", "--no-cache-dir"], 
-                                     capture_output=True, timeout=300, check=False)
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=300, check=False)
                     else:
                         logger.info("Installing PyTorch for x86_64...")
                         subprocess.run([sys.executable, "-m", "pip", "install", "torch", "--no-cache-dir"], 
-                                     capture_output=True, timeout=300, check=False)
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=300, check=False)
                     
                     # Reinstall tiktoken
                     subprocess.run([sys.executable, "-m", "pip", "install", "tiktoken", "--no-cache-dir"], 
-                                 capture_output=True, timeout=60, check=False)
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60, check=False)
                     
                     # Verify it works
                     import torch
@@ -1748,7 +2577,18 @@ class VideoGenerator:
             else:
                 logger.warning(f"PyTorch import error: {e}")
         
-        if not numpy_ok or not torch_ok:
+        return numpy_ok and torch_ok
+    
+    def _add_captions_via_script(self, video_path: str, script: str = None) -> Optional[str]:
+        """
+        Add captions using standalone caption_video.py script.
+        This isolates captioning from the main process to avoid PyTorch issues.
+        """
+        # The dependency state is stable for the process lifetime, so probe
+        # (and pip-repair) at most once
+        if self._caption_deps_ok is None:
+            self._caption_deps_ok = self._probe_caption_deps()
+        if not self._caption_deps_ok:
             logger.warning("PyTorch/NumPy setup incomplete - captioning may fail")
         
         base, ext = os.path.splitext(video_path)
@@ -1758,33 +2598,62 @@ class VideoGenerator:
         
         # Build command - use the same Python that's running this script
         # Get Python executable from sys.executable (which is the Python running main.py)
-        script_path = os.path.join(os.path.dirname(__file__), "caption_video.py")
+        script_path = _CAPTION_SCRIPT
         python_exe = sys.executable  # This is the Python running main.py
         cmd = [python_exe, script_path, video_path, "-o", captioned_path]
         
-        logger.debug(f"Using Python: {python_exe}")
-        logger.debug(f"Caption script: {script_path}")
+        logger.debug("Using Python: %s", python_exe)
+        logger.debug("Caption script: %s", script_path)
         
         if script:
-            cmd.extend(["-s", script])
+            # Passed on stdin: keeps long scripts out of argv (ARG_MAX, visible in ps)
+            cmd.extend(["-s", "-"])
         
         try:
-            # Run with longer timeout and better error handling
-            result = subprocess.run(
+            # Stream output instead of buffering the whole job in memory - only the
+            # last CAPTION_OUTPUT_TAIL_LINES lines of each stream are kept for logging
+            proc = subprocess.Popen(
                 cmd,
-                capture_output=True,
+                stdin=subprocess.PIPE if script else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=900,  # 15 minute timeout (captioning can take a while)
-                cwd=os.path.dirname(__file__)
+                bufsize=1,
+                cwd=_SCRIPT_DIR
             )
+            stdout_tail = deque(maxlen=CAPTION_OUTPUT_TAIL_LINES)
+            stderr_tail = deque(maxlen=CAPTION_OUTPUT_TAIL_LINES)
+            readers = [
+                threading.Thread(target=_drain_stream, args=(proc.stdout, stdout_tail, "stdout"), daemon=True),
+                threading.Thread(target=_drain_stream, args=(proc.stderr, stderr_tail, "stderr"), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
+            if script:
+                try:
+                    proc.stdin.write(script)
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass  # Script exited early - its return code and stderr explain why
+            try:
+                returncode = proc.wait(timeout=900)  # 15 minute timeout (captioning can take a while)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+                raise
+            finally:
+                for reader in readers:
+                    reader.join(timeout=5)
+            stdout_text = "\n".join(stdout_tail)
+            stderr_text = "\n".join(stderr_tail)
             
             # Log output for debugging
-            if result.stdout:
-                logger.debug(f"Caption script stdout: {result.stdout[-1000:]}")
-            if result.stderr:
-                logger.debug(f"Caption script stderr: {result.stderr[-1000:]}")
+            if stdout_text:
+                logger.debug("Caption script stdout: %s", stdout_text[-1000:])
+            if stderr_text:
+                logger.debug("Caption script stderr: %s", stderr_text[-1000:])
             
-            if result.returncode == 0:
+            if returncode == 0:
                 if os.path.exists(captioned_path):
                     logger.info(f"✓ Caption script completed successfully")
                     return captioned_path
@@ -1794,36 +2663,40 @@ class VideoGenerator:
                     logger.warning(f"Current directory: {os.getcwd()}")
                 return None
             else:
-                logger.error(f"Caption script failed with return code {result.returncode}")
-                if result.stderr:
+                logger.error(f"Caption script failed with return code {returncode}")
+                if stderr_text:
                     # Show last 500 chars of stderr (most recent error)
-                    error_tail = result.stderr[-500:] if len(result.stderr) > 500 else result.stderr
-                    logger.error(f"Caption script error: {error_tail}")
-                if result.stdout:
+                    logger.error(f"Caption script error: {stderr_text[-500:]}")
+                if stdout_text:
                     # Show last 500 chars of stdout
-                    stdout_tail = result.stdout[-500:] if len(result.stdout) > 500 else result.stdout
-                    logger.error(f"Caption script output: {stdout_tail}")
+                    logger.error(f"Caption script output: {stdout_text[-500:]}")
                 return None
                 
         except subprocess.TimeoutExpired:
-            logger.error("Caption script timed out after 10 minutes")
+            logger.error("Caption script timed out after 15 minutes")
             return None
         except Exception as e:
             logger.error(f"Error calling caption script: {e}")
             return None
     
-    def _add_background_audio(self, video_path: str) -> Optional[str]:
+    def _add_background_audio(self, video_path: str, max_duration: Optional[float] = None) -> Optional[str]:
         """
         Add background audio overlay to video.
         Audio will be trimmed/looped to match video duration.
         
         Args:
             video_path: Path to captioned video
+            max_duration: Also cut the output to this many seconds (folds the final
+                duration cap into the same stream-copy pass)
             
         Returns:
             Path to video with audio overlay, or None if failed
         """
-        bg_audio_path = os.path.join(os.path.dirname(__file__), "officialbg.mp3")
+        bg_audio_path = _BG_AUDIO
+        
+        if not _FFMPEG_OK:
+            logger.warning("ffmpeg not found - cannot add background audio")
+            return None
         
         if not os.path.exists(bg_audio_path):
             logger.warning(f"Background audio file not found: {bg_audio_path}")
@@ -1840,167 +2713,51 @@ class VideoGenerator:
         logger.info(f"Output will be: {output_path}")
         
         try:
-            # Use MoviePy to add audio
-            try:
-                from moviepy.editor import VideoFileClip, AudioFileClip, CompositeAudioClip
-            except ImportError:
-                from moviepy import VideoFileClip, AudioFileClip, CompositeAudioClip
-            
-            # Load video
-            video = VideoFileClip(video_path)
-            video_duration = video.duration
-            
-            logger.info(f"Video duration: {video_duration:.2f}s")
-            
-            # Load background audio
-            bg_audio = AudioFileClip(bg_audio_path)
-            bg_audio_duration = bg_audio.duration
-            
-            logger.info(f"Background audio duration: {bg_audio_duration:.2f}s")
-            
-            # Trim or loop audio to match video duration
-            if bg_audio_duration >= video_duration:
-                # Trim audio to video duration
-                try:
-                    bg_audio = bg_audio.subclip(0, video_duration)
-                except AttributeError:
-                    # Fallback: use ffmpeg to trim
-                    import subprocess
-                    temp_audio = os.path.join(os.path.dirname(__file__), "temp_bg_audio.mp3")
-                    subprocess.run([
-                        'ffmpeg', '-i', bg_audio_path, '-t', str(video_duration),
-                        '-y', temp_audio
-                    ], capture_output=True, check=True)
-                    bg_audio.close()
-                    bg_audio = AudioFileClip(temp_audio)
-                logger.info(f"Trimmed audio to match video duration")
-            else:
-                # Loop audio to match video duration
-                loops_needed = int(video_duration / bg_audio_duration) + 1
-                audio_clips = [bg_audio] * loops_needed
-                bg_audio = CompositeAudioClip(audio_clips)
-                try:
-                    bg_audio = bg_audio.subclip(0, video_duration)
-                except AttributeError:
-                    # If subclip doesn't work, use ffmpeg
-                    import subprocess
-                    temp_audio = os.path.join(os.path.dirname(__file__), "temp_bg_audio_loop.mp3")
-                    # Create looped audio with ffmpeg
-                    subprocess.run([
-                        'ffmpeg', '-stream_loop', str(loops_needed - 1), '-i', bg_audio_path,
-                        '-t', str(video_duration), '-y', temp_audio
-                    ], capture_output=True, check=True)
-                    bg_audio.close()
-                    bg_audio = AudioFileClip(temp_audio)
-                logger.info(f"Looped audio {loops_needed} times to match video duration")
-            
-            # Set audio volume (lower volume for background, keep original video audio)
-            # User request: increase background music by +15%
-            bg_volume = 0.3 * 1.15  # 34.5%
-            try:
-                bg_audio = bg_audio.volumex(bg_volume)
-            except AttributeError:
-                try:
-                    bg_audio = bg_audio.with_volume(bg_volume)  # Alternative API
-                except AttributeError:
-                    # Use ffmpeg to adjust volume if MoviePy doesn't support it
-                    import subprocess
-                    temp_audio_vol = os.path.join(os.path.dirname(__file__), "temp_bg_audio_vol.mp3")
-                    subprocess.run([
-                        'ffmpeg', '-i', bg_audio.filename if hasattr(bg_audio, 'filename') else bg_audio_path,
-                        '-filter:a', f'volume={bg_volume}', '-y', temp_audio_vol
-                    ], capture_output=True, check=True)
-                    bg_audio.close()
-                    bg_audio = AudioFileClip(temp_audio_vol)
-            
-            # Combine video audio with background audio
-            if video.audio:
-                # Video has audio, mix them
-                final_audio = CompositeAudioClip([video.audio, bg_audio])
+            # Mix with the video's own audio (the voiceover) when it has any
+            info = _probe_media(video_path)
+            bg = f"[1:a]volume={BG_MUSIC_VOLUME:.3f}"
+            if info is None or info["has_audio"]:
+                # amix scales each input by 1/inputs; volume=2 restores the voiceover level
+                graph = f"{bg}[bg];[0:a][bg]amix=inputs=2:duration=first:dropout_transition=0,volume=2[aout]"
                 logger.info("Mixing video audio with background audio")
             else:
-                # Video has no audio, use only background
-                final_audio = bg_audio
+                graph = f"{bg}[aout]"
                 logger.info("Using only background audio (video has no audio)")
             
-            # Set final audio to video
-            try:
-                final_video = video.set_audio(final_audio)
-            except AttributeError:
-                try:
-                    final_video = video.with_audio(final_audio)
-                except AttributeError:
-                    # Fallback: use ffmpeg to combine
-                    import subprocess
-                    temp_video_audio = os.path.join(os.path.dirname(__file__), "temp_video_audio.mp4")
-                    # Extract video without audio
-                    subprocess.run([
-                        'ffmpeg', '-i', video_path, '-c:v', 'copy', '-an', '-y', temp_video_audio
-                    ], capture_output=True, check=True)
-                    # Extract audio to temp file
-                    temp_final_audio = os.path.join(os.path.dirname(__file__), "temp_final_audio.m4a")
-                    final_audio.write_audiofile(temp_final_audio, verbose=False, logger=None)
-                    # Combine with ffmpeg
-                    subprocess.run([
-                        'ffmpeg', '-i', temp_video_audio, '-i', temp_final_audio,
-                        '-c:v', 'copy', '-c:a', 'aac', '-shortest', '-y', output_path
-                    ], capture_output=True, check=True)
-                    # Cleanup temp files
-                    try:
-                        os.remove(temp_video_audio)
-                        os.remove(temp_final_audio)
-                    except:
-                        pass
-                    video.close()
-                    final_audio.close()
-                    logger.info(f"✓ Video with background audio saved: {output_path}")
-                    return output_path
-            
-            # Write final video
-            logger.info("Rendering video with background audio...")
-            final_video.write_videofile(
-                output_path,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile='temp-audio-bg.m4a',
-                remove_temp=True
-            )
-            
-            # Cleanup
-            video.close()
-            bg_audio.close()
-            final_video.close()
-            if video.audio:
-                video.audio.close()
+            # One ffmpeg pass: the music is looped at the demuxer and cut at the video's end,
+            # and the video stream is copied rather than re-encoded
+            cmd = [_FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+                   '-i', video_path, '-stream_loop', '-1', '-i', bg_audio_path,
+                   '-filter_complex', graph, '-map', '0:v', '-map', '[aout]',
+                   '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k', '-shortest']
+            if max_duration:
+                cmd += ['-t', str(max_duration)]
+            cmd += ['-movflags', '+faststart', '-y', output_path]
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            if result.returncode != 0:
+                logger.error(f"ffmpeg failed to add background audio: {result.stderr[-500:]}")
+                return None
             
             logger.info(f"✓ Video with background audio saved: {output_path}")
             return output_path
             
         except Exception as e:
             logger.error(f"Error adding background audio: {e}")
-            import traceback
             logger.debug(traceback.format_exc())
             return None
 
-    def _ensure_under_duration(self, video_path: str, max_duration: int = 59) -> Optional[str]:
+    def _ensure_under_duration(self, video_path: str, max_duration: int = FINAL_MAX_DURATION) -> Optional[str]:
         """
         Hard-trim the final output to max_duration seconds if it exceeds it.
         This guarantees we never upload a video longer than 59s (YouTube Shorts safe).
         """
-        import subprocess
         if not os.path.exists(video_path):
             return None
-        try:
-            # Probe duration
-            probe = subprocess.run(
-                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-                 '-of', 'default=noprint_wrappers=1:nokey=1', video_path],
-                capture_output=True, text=True, timeout=10
-            )
-            duration = float(probe.stdout.strip() or 0)
-        except Exception as e:
-            logger.warning(f"Could not probe video duration for cap: {e}")
+        info = _probe_media(video_path)
+        if info is None:
+            logger.warning("Could not probe video duration for cap")
             return None
+        duration = info["duration"] or 0
 
         if duration <= (max_duration + 0.2):
             logger.info(f"✓ Final duration OK: {duration:.2f}s")
@@ -2010,14 +2767,22 @@ class VideoGenerator:
         base, ext = os.path.splitext(video_path)
         trimmed_path = f"{base}_capped{ext}"
         try:
-            # Re-encode to ensure clean cut + audio stops with video
-            subprocess.run(
-                ['ffmpeg', '-i', video_path, '-t', str(max_duration),
-                 '-c:v', 'libx264', '-preset', 'fast', '-crf', '20',
-                 '-c:a', 'aac', '-b:a', '192k', '-movflags', '+faststart',
-                 '-y', trimmed_path],
-                capture_output=True, text=True, timeout=600, check=True
-            )
+            # Cutting the tail needs no keyframe, so a stream copy is exact enough (-t cuts
+            # audio and video together); re-encode only if the remux fails
+            try:
+                subprocess.run(
+                    [_FFMPEG_PATH, '-i', video_path, '-t', str(max_duration), '-c', 'copy',
+                     '-movflags', '+faststart', '-y', trimmed_path],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120, check=True
+                )
+            except subprocess.CalledProcessError:
+                logger.warning("Stream-copy trim failed, re-encoding")
+                subprocess.run(
+                    [_FFMPEG_PATH, '-i', video_path, '-t', str(max_duration), *_h264_args(),
+                     '-c:a', 'aac', '-b:a', '192k', '-movflags', '+faststart',
+                     '-y', trimmed_path],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=600, check=True
+                )
             # Replace original
             os.replace(trimmed_path, video_path)
             logger.info("✓ Applied 59s hard cap to final output")
@@ -2028,7 +2793,7 @@ class VideoGenerator:
     
     def add_captions_to_video(self, video_path: str, script: str = None, output_path: str = None) -> Optional[str]:
         """
-        Add captions to video using Whisper timestamps + MoviePy styling.
+        Add captions to video using Whisper timestamps + libass styling.
         Captions are positioned in the center of the screen.
         
         Args:
@@ -2039,18 +2804,17 @@ class VideoGenerator:
         Returns:
             Path to captioned video, or None if failed
         """
-        # Try to import whisper - catch any errors
+        # Shared Whisper/ASS/libass helpers (imported here: caption_video configures logging on import)
+        from caption_video import (FASTER_WHISPER_AVAILABLE, transcribe_segments, group_word_captions,
+                                   probe_video_size, write_ass_subtitles, burn_subtitles)
+        
+        # Try to import whisper - catch any errors (faster-whisper needs no PyTorch)
         try:
-            import whisper
-            # Test that we can actually load a model (quick test)
-            try:
-                # Don't actually load, just verify import works
-                logger.debug("Whisper imported successfully")
-            except:
-                pass
+            if not FASTER_WHISPER_AVAILABLE:
+                import whisper
         except ImportError as e:
             logger.warning(f"Whisper not available: {e}")
-            logger.warning("Install with: pip install openai-whisper")
+            logger.warning("Install with: pip install faster-whisper (or openai-whisper)")
             return None
         except Exception as e:
             # Handle architecture mismatches, PyTorch issues, etc.
@@ -2059,9 +2823,8 @@ class VideoGenerator:
             
             # Log the FULL error for debugging
             logger.warning(f"Whisper import error: {error_type}: {e}")
-            import traceback
             full_traceback = traceback.format_exc()
-            logger.debug(f"Full traceback:\n{full_traceback}")
+            logger.debug("Full traceback:\n%s", full_traceback)
             
             # Only catch ACTUAL architecture errors (very specific patterns)
             is_arch_error = (
@@ -2079,23 +2842,7 @@ class VideoGenerator:
                 logger.warning("Captioning disabled due to import error")
             return None
         
-        try:
-            try:
-                from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
-            except ImportError:
-                from moviepy import VideoFileClip, TextClip, CompositeVideoClip
-            import subprocess
-            import ssl
-            import certifi
-        except ImportError as e:
-            logger.warning(f"MoviePy not available: {e}")
-            logger.warning("Install with: pip install moviepy certifi")
-            return None
-        
-        # Check if ffmpeg is available
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True, timeout=5)
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
+        if not _FFMPEG_OK:
             logger.warning("ffmpeg not found - cannot add captions")
             return None
         
@@ -2113,20 +2860,10 @@ class VideoGenerator:
         try:
             # Step 1: Extract timestamps with Whisper
             logger.info("Extracting timestamps with Whisper...")
-            
-            # Handle SSL certificate issues
-            try:
-                ssl_context = ssl.create_default_context(cafile=certifi.where())
-            except:
-                logger.warning("SSL certificate issue detected, using unverified context")
-                ssl_context = ssl._create_unverified_context()
-            
-            import urllib.request
-            original_ssl = ssl._create_default_https_context
-            ssl._create_default_https_context = lambda: ssl_context
-            
+            if script:
+                logger.info("Using provided script text to help Whisper")
             try:
-                model = whisper.load_model("base")
+                segments = transcribe_segments(video_path, script)
             except Exception as e:
                 # Handle PyTorch architecture issues, model loading failures, etc.
                 error_msg = str(e).lower()
@@ -2135,119 +2872,35 @@ class VideoGenerator:
                     logger.error("PyTorch architecture mismatch - cannot load Whisper model")
                     logger.error("Fix with: pip uninstall torch && pip install torch")
                 else:
-                    logger.error(f"Failed to load Whisper model: {e}")
+                    logger.error(f"Whisper transcription failed: {e}")
                 return None
-            finally:
-                ssl._create_default_https_context = original_ssl
-            
-            transcribe_options = {
-                "word_timestamps": True,
-                "verbose": False,
-            }
-            
-            if script:
-                transcribe_options["initial_prompt"] = script[:200]
-                logger.info("Using provided script text to help Whisper")
-            
-            result = model.transcribe(video_path, **transcribe_options)
-            segments = result["segments"]
             logger.info(f"✓ Got {len(segments)} caption segments")
             
             if not segments:
                 logger.warning("No segments found in transcription")
                 return None
             
-            # Step 2: Load video with MoviePy
-            logger.info("Loading video with MoviePy...")
-            video = VideoFileClip(video_path)
-            logger.info(f"Video duration: {video.duration:.2f}s, size: {video.w}x{video.h}")
-            
-            # Step 3: Create text clips (centered on screen)
-            logger.info("Creating styled text clips...")
-            text_clips = []
-            for i, seg in enumerate(segments):
-                text = seg["text"].strip()
-                start_time = seg["start"]
-                end_time = seg["end"]
-                duration = end_time - start_time
-                
-                if not text or duration <= 0:
-                    continue
-                
-                # Style for YouTube Shorts (center of screen, readable)
-                try:
-                    txt_clip = TextClip(
-                        text=text,
-                        font_size=48,
-                        color='white',
-                        stroke_color='black',
-                        stroke_width=3,
-                        method='caption',
-                        size=(int(video.w * 0.9), None),
-                        text_align='center'
-                    )
-                except (TypeError, ValueError):
-                    try:
-                        txt_clip = TextClip(
-                            text=text,
-                            font_size=48,
-                            color='white',
-                            stroke_color='black',
-                            stroke_width=3,
-                            size=(int(video.w * 0.9), None),
-                            text_align='center'
-                        )
-                    except (TypeError, ValueError):
-                        txt_clip = TextClip(
-                            text=text,
-                            font_size=48,
-                            color='white',
-                            size=(int(video.w * 0.9), None)
-                        )
-                
-                # Position captions in the CENTER of the screen
-                try:
-                    txt_clip = txt_clip.with_position(('center', 'center')) \
-                                       .with_start(start_time) \
-                                       .with_duration(duration)
-                except AttributeError:
-                    txt_clip = txt_clip.set_position(('center', 'center')) \
-                                       .set_start(start_time) \
-                                       .set_duration(duration)
-                
-                text_clips.append(txt_clip)
-                
-                if (i + 1) % 10 == 0:
-                    logger.info(f"  Created {i + 1}/{len(segments)} text clips...")
-            
-            logger.info(f"✓ Created {len(text_clips)} text clips")
-            
-            # Step 4: Composite video + captions
-            logger.info("Compositing video with captions...")
-            final = CompositeVideoClip([video] + text_clips)
+            # Step 2: Write 2-3 word captions (Whisper word timings) as ASS subtitles sized to the video
+            size = probe_video_size(video_path)
+            if not size:
+                logger.error("Could not read video dimensions")
+                return None
+            logger.info(f"Video size: {size[0]}x{size[1]}")
+            captions = group_word_captions(segments)
             
-            # Step 5: Write output
+            # Step 3: Burn in (centered) with libass in a single ffmpeg encode
             logger.info(f"Rendering captioned video (this may take a minute)...")
-            final.write_videofile(
-                output_path,
-                codec='libx264',
-                audio_codec='aac',
-                fps=video.fps,
-                preset='medium',
-                threads=4,
-                logger=None
-            )
-            
-            # Cleanup
-            video.close()
-            final.close()
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                ass_path = os.path.join(tmp_dir, "captions.ass")
+                write_ass_subtitles(captions, ass_path, *size)
+                if not burn_subtitles(video_path, ass_path, output_path):
+                    return None
             
             logger.info(f"✓ Captioned video saved: {output_path}")
             return output_path
             
         except Exception as e:
             logger.error(f"Captioning failed: {e}")
-            import traceback
             logger.debug(traceback.format_exc())
         return None
     
@@ -2280,7 +2933,7 @@ class VideoGenerator:
         if AI_AVAILABLE:
             try:
                 logger.info(f"Generating full first-person Reddit story script...")
-                logger.debug(f"Story preview: {story_text[:200]}...")
+                logger.debug("Story preview: %s...", story_text[:200])
 
                 # If the Reddit title is already a strong first-person hook, use it verbatim as the opening line.
                 desired_hook = None
@@ -2289,12 +2942,11 @@ class VideoGenerator:
                 
                 # Create a prompt for AI to create a FULL story script with bold hook
                 # Extract key theme for hook statement
-                import re
                 # Try to identify the main theme/conflict from title and first few sentences
                 theme_keywords = []
                 if title:
                     # Extract key words from title
-                    title_words = re.findall(r'\b\w{4,}\b', title.lower())
+                    title_words = _WORD_RE.findall(title.lower())
                     theme_keywords.extend(title_words[:3])
                 
                 hook_instruction = ""
@@ -2336,13 +2988,8 @@ Story: {story_text[:2000]}
 
 Script:"""
                 
-                # Use Hugging Face API to generate full script
-                try:
-                    from ai_text_generator import generate_text_with_hf
-                    script = generate_text_with_hf(prompt, max_length=300)  # Increased max_length for full story
-                except ImportError:
-                    logger.warning("ai_text_generator not available, using manual extraction")
-                    script = None
+                # Use Hugging Face API to generate full script (AI_AVAILABLE guarantees the import)
+                script = generate_text_with_hf(prompt, max_length=300)  # Increased max_length for full story
                 
                 if script:
                     # Clean up the script (remove extra whitespace, ensure it's first person)
@@ -2351,49 +2998,27 @@ Script:"""
                     if script.lower().startswith("script:"):
                         script = script[7:].strip()
                     
-                    # Remove ALL filler phrases at the start
-                    filler_phrases = [
-                        "i have a story",
-                        "let me tell you",
-                        "buckle up",
-                        "like the title says",
-                        "get ready",
-                        "prepare yourself",
-                        "listen to this",
-                        "you won't believe",
-                        "wait until you hear",
-                        "this story",
-                        "here's what happened"
-                    ]
-                    script_lower = script.lower()
-                    for filler in filler_phrases:
-                        if script_lower.startswith(filler):
-                            # Remove filler phrase and continue
-                            script = script[len(filler):].strip()
-                            # Remove leading punctuation
-                            while script and script[0] in '.,:;':
-                                script = script[1:].strip()
-                            script_lower = script.lower()
-                            break
+                    # Remove ALL filler phrases at the start (and the punctuation after them)
+                    script = _FILLER_RE.sub('', script, count=1)
                     
-                    # Check for duplicate hook statements (if first sentence repeats)
-                    sentences = script.split('.')
-                    if len(sentences) >= 2:
-                        first_sent = sentences[0].strip()
-                        second_sent = sentences[1].strip()
+                    # Check for duplicate hook statements (if first sentence repeats).
+                    # Only the first two sentences matter, so split off just those and
+                    # tokenize no more words than the comparison looks at.
+                    first_sent, _, rest = script.partition('.')
+                    if rest:
+                        first_sent = first_sent.strip()
+                        second_sent = rest.partition('.')[0].strip()
                         # If first two sentences are very similar, remove duplicate
                         if first_sent and second_sent:
                             # Check if they're essentially the same (with minor variations)
-                            first_words = set(first_sent.lower().split()[:5])
-                            second_words = set(second_sent.lower().split()[:5])
+                            first_words = set(first_sent.lower().split(None, 5)[:5])
+                            second_words = set(second_sent.lower().split(None, 5)[:5])
                             similarity = len(first_words & second_words) / max(len(first_words), len(second_words), 1)
-                            if similarity > 0.6 and len(first_sent.split()) <= 15:
+                            if similarity > 0.6 and len(first_sent.split(None, 15)) <= 15:
                                 # Likely duplicate - remove first sentence
                                 logger.info(f"  Removing duplicate hook: '{first_sent}'")
-                                script = '. '.join(sentences[1:]).strip()
-                                if not script.startswith('.'):
-                                    script = script
-                                else:
+                                script = rest.strip()
+                                if script.startswith('.'):
                                     script = script[1:].strip()
                     
                     # Remove the prompt if AI included it
@@ -2434,7 +3059,7 @@ Script:"""
 
                     # If too long, trim while keeping an ending (last sentence)
                     if word_count > max_words:
-                        sent_list = [s.strip() for s in re.split(r'[.!?]+', script) if s.strip()]
+                        sent_list = _split_sentences(script)
                         if sent_list:
                             ending = sent_list[-1]
                             out = []
@@ -2449,7 +3074,7 @@ Script:"""
                             if ending and ending not in out:
                                 out.append(ending)
                             script = ". ".join(out).strip()
-                            if script and not script.endswith(('.', '!', '?')):
+                            if script and not script.endswith(_END_PUNCT):
                                 script += "."
                             word_count = len(script.split())
                             estimated_duration = word_count / 3.8
@@ -2465,14 +3090,13 @@ Script:"""
         # Fallback: Extract FULL story from story text manually
         # ALWAYS prioritize story text (description) over title
         # Keep the complete narrative, not just snippets
-        import re
         
         # Clean up the story text
-        story_text = re.sub(r'\s+', ' ', story_text)  # Normalize whitespace
+        story_text = _WS_RE.sub(' ', story_text)  # Normalize whitespace
+        title_s = _WS_RE.sub(' ', title or "").strip()
         
         # Split into sentences
-        sentences = re.split(r'[.!?]+', story_text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 5]
+        sentences = _split_sentences(story_text, min_len=5)
         
         if not sentences:
             # If no sentences found, try to extract from title as last resort
@@ -2486,55 +3110,50 @@ Script:"""
         script_sentences = []
         
         # Hook MUST match the actual story/topic: prefer title if it's a strong first-person line.
+        first_sent = sentences[0] if sentences else ""
         hook_statement = None
-        if title and title.strip().startswith("I ") and len(title.split()) <= 18:
-            hook_statement = title.strip()
+        if title_s.startswith("I ") and _word_count(title_s) <= 18:
+            hook_statement = title_s
         else:
             # Use first sentence from story text
-            first_sent = sentences[0] if sentences else ""
             hook_statement = first_sent.strip() if first_sent else story_text[:80].strip()
         if hook_statement and not hook_statement.endswith('.'):
             hook_statement += '.'
+        hook_lower = hook_statement.lower() if hook_statement else ""
         
         # Check if first sentence is already a hook (don't duplicate)
-        first_sent = sentences[0] if sentences else ""
         is_first_sent_hook = False
-        if first_sent:
+        if first_sent and hook_statement and first_sent == hook_statement.rstrip('.!?'):
+            # Hook was taken from the first sentence (plus a period) - no need to compare words
+            is_first_sent_hook = True
+        elif first_sent:
             # Check if first sentence is similar to our hook
-            first_words = set(first_sent.lower().split()[:5])
-            hook_words = set(hook_statement.lower().split()[:5]) if hook_statement else set()
+            first_words = set(first_sent.lower().split(None, 5)[:5])
+            hook_words = set(hook_lower.split(None, 5)[:5])
             if hook_words:
                 similarity = len(first_words & hook_words) / max(len(first_words), len(hook_words), 1)
                 is_first_sent_hook = similarity > 0.5
         
         # Only add hook if first sentence isn't already a hook
-        if hook_statement and not is_first_sent_hook and not any(phrase in hook_statement.lower() for phrase in [
-            "i have a story", "let me tell you", "i want to share", "i have something"
-        ]):
+        if hook_statement and not is_first_sent_hook and not any(p in hook_lower for p in _HOOK_PHRASES):
             script_sentences.append(hook_statement)
         
-        # Start with opening (first 3-5 sentences)
-        opening_count = min(5, len(sentences))
-        script_sentences.extend(sentences[:opening_count])
-        
-        # Add middle section (next 5-10 sentences with dramatic moments)
-        if len(sentences) > opening_count:
-            middle_start = opening_count
-            middle_end = min(opening_count + 10, len(sentences))
-            script_sentences.extend(sentences[middle_start:middle_end])
+        # Opening (first 5 sentences) and middle section (next 10) are contiguous, so take them in one slice
+        n = len(sentences)
+        middle_end = min(15, n)
+        script_sentences.extend(sentences[:middle_end])
         
         # Add conclusion (last 3-5 sentences)
-        if len(sentences) > opening_count + 10:
-            conclusion_start = max(opening_count + 10, len(sentences) - 5)
-            script_sentences.extend(sentences[conclusion_start:])
+        if n > middle_end:
+            script_sentences.extend(sentences[max(middle_end, n - 5):])
         
         # Join sentences into a coherent story
         initial_script = ". ".join(script_sentences)
         # Add period at end if missing
-        if initial_script and not initial_script[-1] in '.!?':
+        if initial_script and not initial_script.endswith(_END_PUNCT):
             initial_script += "."
         
-        word_count = len(initial_script.split())
+        word_count = _word_count(initial_script)
         
         # Ensure reasonable length for < 60s videos (aim ~50s)
         estimated_duration = word_count / 3.8
@@ -2544,69 +3163,54 @@ Script:"""
         if word_count < min_words:
             # Expand short stories with on-topic narration (no unrelated details)
             logger.warning(f"Fallback script too short ({word_count} words, est ~{estimated_duration:.1f}s) — expanding")
-            extra = []
-            t = (title or "").lower()
-            s = (story_text or "").lower()
-            closure_sentence = None
             # Basic, topic-aligned expansion templates
-            if "smok" in t or "cig" in t or "smok" in s or "cig" in s:
-                closure_sentence = "Now when he offers, I just say no—and he finally respects it."
-                extra.extend([
-                    "Every time we hung out, he would offer me one like it was nothing.",
-                    "I kept saying no, but he treated it like a joke instead of a boundary.",
-                    "It wasn’t the cigarette that got to me—it was the way he ignored what I was trying to change.",
-                    "I could feel that old craving creeping back in, and it made me angry at myself.",
-                    "When I finally told him the real reason I quit, everything got quiet.",
-                    "After that, he showed up trying to help instead of tempt me, and that meant more than I expected.",
-                    closure_sentence,
-                ])
+            if _TOPIC_SMOKING_RE.search(title_s) or _TOPIC_SMOKING_RE.search(story_text):
+                closure_sentence, extra = _SMOKING_CLOSURE, _SMOKING_EXPANSION
             else:
-                closure_sentence = "In the end, it was resolved—and I didn’t have to become someone I’m not to get there."
-                extra.extend([
-                    "At first, I tried to brush it off, but it kept happening.",
-                    "The more I thought about it, the more it bothered me.",
-                    "I didn’t want drama—I just wanted to be heard.",
-                    "When I finally spoke up, the whole mood changed.",
-                    "Afterward, I realized I should’ve said something sooner.",
-                    closure_sentence,
-                ])
+                closure_sentence, extra = _GENERIC_CLOSURE, _GENERIC_EXPANSION
             # Append until we reach target_words (or we run out)
-            words_now = len(initial_script.split())
+            # Count words incrementally and join once, instead of re-splitting the growing script
+            words_now = word_count
+            parts = [initial_script.rstrip()]
             for sent in extra:
                 if words_now >= target_words:
                     break
-                initial_script = (initial_script.rstrip() + " " + sent).strip()
-                words_now = len(initial_script.split())
+                parts.append(sent)
+                words_now += _word_count(sent)
+            initial_script = " ".join(parts).strip()
 
             # Ensure we end with a clear closing sentence.
             if closure_sentence:
                 # Normalize existing sentence endings for comparison
-                normalized = initial_script.replace("’", "'")
-                closure_norm = closure_sentence.replace("’", "'")
+                normalized = initial_script.translate(_SMART_QUOTE_TABLE)
+                closure_norm = closure_sentence.translate(_SMART_QUOTE_TABLE)
                 if closure_norm not in normalized:
                     # Try to append closure; if it would exceed max_words, replace the last sentence with it.
-                    if len((initial_script + " " + closure_sentence).split()) <= max_words:
+                    closure_words = _word_count(closure_sentence)
+                    if words_now + closure_words <= max_words:
                         initial_script = (initial_script.rstrip() + " " + closure_sentence).strip()
+                        words_now += closure_words
                     else:
                         # Replace last sentence
-                        sent_list = [s.strip() for s in re.split(r'[.!?]+', initial_script) if s.strip()]
+                        sent_list = _split_sentences(initial_script)
                         if sent_list:
                             sent_list[-1] = closure_sentence
                             initial_script = ". ".join(sent_list).strip()
-                if initial_script and not initial_script.endswith(('.', '!', '?')):
+                            words_now = _word_count(initial_script)
+                if initial_script and not initial_script.endswith(_END_PUNCT):
                     initial_script += "."
 
             word_count = words_now
             estimated_duration = word_count / 3.8
             logger.info(f"✓ Expanded fallback script to {word_count} words (est ~{estimated_duration:.1f}s)")
         elif word_count > max_words:
-            sent_list = [s.strip() for s in re.split(r'[.!?]+', initial_script) if s.strip()]
+            sent_list = _split_sentences(initial_script)
             if sent_list:
                 ending = sent_list[-1]
                 out = []
                 out_words = 0
                 for s in sent_list[:-1]:
-                    w = len(s.split())
+                    w = _word_count(s)
                     if out_words + w > target_words - 18:
                         break
                     out.append(s)
@@ -2614,11 +3218,14 @@ Script:"""
                 if ending and ending not in out:
                     out.append(ending)
                 initial_script = ". ".join(out).strip()
-                if initial_script and not initial_script.endswith(('.', '!', '?')):
+                if initial_script and not initial_script.endswith(_END_PUNCT):
                     initial_script += "."
-                word_count = len(initial_script.split())
+                word_count = _word_count(initial_script)
                 estimated_duration = word_count / 3.8
                 logger.info(f"✓ Trimmed fallback script to {word_count} words (est ~{estimated_duration:.1f}s) keeping an ending")
+        else:
+            # Already between min_words and max_words - no closure scan or re-splitting needed
+            logger.info("✓ Fallback script in range, no adjustment")
         
         logger.info(f"✓ Generated full first-person story script ({word_count} words, est ~{estimated_duration:.1f}s)")
         return initial_script
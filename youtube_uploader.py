@@ -5,11 +5,12 @@ Manages OAuth authentication and video uploads with metadata.
 import os
 import sys
 import httplib2
+import json
 import logging
 import random
 import time
 import warnings
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 # Suppress Python 3.9 compatibility warnings from Google API libraries
 warnings.filterwarnings("ignore", category=FutureWarning, message=".*importlib.metadata.*")
@@ -57,6 +58,63 @@ RETRIABLE_EXCEPTIONS = (
     TimeoutError
 )
 
+# Help text logged (as one record each) when an upload is rejected with 403
+_RULE = "=" * 60
+_QUOTA_BANNER = "\n".join((
+    _RULE,
+    "YOUTUBE API QUOTA EXCEEDED",
+    _RULE,
+    "You have reached your daily YouTube API quota limit.",
+    "",
+    "YouTube API Quota Limits:",
+    "  • Default quota: 10,000 units per day",
+    "  • Video upload (videos.insert): 1,600 units per upload",
+    "  • Approximate uploads per day: ~6 videos (with default quota)",
+    "",
+    "Solutions:",
+    "  1. Wait until tomorrow (quota resets daily)",
+    "  2. Request a quota increase:",
+    "     - Go to Google Cloud Console",
+    "     - Select your project",
+    "     - Navigate to 'APIs & Services' > 'Quotas'",
+    "     - Search for 'YouTube Data API v3'",
+    "     - Request increase for 'Queries per day'",
+    "",
+    "  3. Check your current quota usage:",
+    "     - Google Cloud Console > APIs & Services > Dashboard",
+    "     - Look for 'YouTube Data API v3' usage",
+    "",
+))
+_FORBIDDEN_BANNER = "\n".join((
+    _RULE,
+    "YOUTUBE API ERROR (403 Forbidden)",
+    _RULE,
+    "Possible causes:",
+    "  • Quota exceeded (see above)",
+    "  • Invalid OAuth credentials",
+    "  • Insufficient permissions",
+    "  • Account restrictions",
+    "",
+))
+
+
+def _extract_error(content: str) -> Tuple[str, str]:
+    """
+    Pull the first error reason and the message out of an HttpError body.
+    
+    Args:
+        content: Decoded response body of the HttpError
+        
+    Returns:
+        (reason, message), empty strings when the body is not the usual JSON error
+    """
+    try:
+        err = json.loads(content).get('error', {})
+        first = (err.get('errors') or [{}])[0]
+        return first.get('reason', ''), err.get('message', '')
+    except Exception:
+        return '', ''
+
 
 class YouTubeUploader:
     """Handles YouTube video uploads and channel management."""
@@ -166,7 +224,7 @@ class YouTubeUploader:
         
         # Create insert request
         insert_request = self.youtube_service.videos().insert(
-            part=",".join(body.keys()),
+            part="snippet,status",  # keep in sync with the keys of body
             body=body,
             media_body=media
         )
@@ -204,62 +262,19 @@ class YouTubeUploader:
                         return None
                         
             except HttpError as e:
-                error_content = str(e.content) if hasattr(e, 'content') else str(e)
-                error_reason = ""
-                error_message = ""
-                
-                # Try to extract error reason from response
-                try:
-                    import json
-                    if hasattr(e, 'content'):
-                        error_data = json.loads(e.content.decode('utf-8'))
-                        error_reason = error_data.get('error', {}).get('errors', [{}])[0].get('reason', '')
-                        error_message = error_data.get('error', {}).get('message', '')
-                except:
-                    pass
+                raw = getattr(e, 'content', None)
+                error_content = raw.decode('utf-8', 'replace') if isinstance(raw, (bytes, bytearray)) else (raw or str(e))
+                error_reason, error_message = _extract_error(error_content)
                 
                 # Check for quota exceeded error (403 with quotaExceeded reason)
-                if e.resp.status == 403 and ('quotaExceeded' in error_reason or 'quota' in error_content.lower() or 'limit' in error_content.lower()):
-                    logger.error("\n" + "="*60)
-                    logger.error("YOUTUBE API QUOTA EXCEEDED")
-                    logger.error("="*60)
-                    logger.error("You have reached your daily YouTube API quota limit.")
-                    logger.error("")
-                    logger.error("YouTube API Quota Limits:")
-                    logger.error("  • Default quota: 10,000 units per day")
-                    logger.error("  • Video upload (videos.insert): 1,600 units per upload")
-                    logger.error("  • Approximate uploads per day: ~6 videos (with default quota)")
-                    logger.error("")
-                    logger.error("Solutions:")
-                    logger.error("  1. Wait until tomorrow (quota resets daily)")
-                    logger.error("  2. Request a quota increase:")
-                    logger.error("     - Go to Google Cloud Console")
-                    logger.error("     - Select your project")
-                    logger.error("     - Navigate to 'APIs & Services' > 'Quotas'")
-                    logger.error("     - Search for 'YouTube Data API v3'")
-                    logger.error("     - Request increase for 'Queries per day'")
-                    logger.error("")
-                    logger.error("  3. Check your current quota usage:")
-                    logger.error("     - Google Cloud Console > APIs & Services > Dashboard")
-                    logger.error("     - Look for 'YouTube Data API v3' usage")
-                    logger.error("")
-                    logger.error(f"Error details: {error_message if error_message else error_content}")
-                    logger.error("="*60)
+                content_lower = error_content.lower() if e.resp.status == 403 else ""
+                if e.resp.status == 403 and ('quotaExceeded' in error_reason or 'quota' in content_lower or 'limit' in content_lower):
+                    logger.error("\n%s\nError details: %s\n%s", _QUOTA_BANNER, error_message or error_content, _RULE)
                     return None
                 
                 # Check for other 403 errors (forbidden)
                 if e.resp.status == 403:
-                    logger.error("\n" + "="*60)
-                    logger.error("YOUTUBE API ERROR (403 Forbidden)")
-                    logger.error("="*60)
-                    logger.error("Possible causes:")
-                    logger.error("  • Quota exceeded (see above)")
-                    logger.error("  • Invalid OAuth credentials")
-                    logger.error("  • Insufficient permissions")
-                    logger.error("  • Account restrictions")
-                    logger.error("")
-                    logger.error(f"Error: {error_message if error_message else error_content}")
-                    logger.error("="*60)
+                    logger.error("\n%s\nError: %s\n%s", _FORBIDDEN_BANNER, error_message or error_content, _RULE)
                     return None
                 
                 if e.resp.status in RETRIABLE_STATUS_CODES:
@@ -279,8 +294,7 @@ class YouTubeUploader:
                     logger.error("No longer attempting to retry.")
                     return None
                 
-                max_sleep = 2 ** retry
-                sleep_seconds = random.random() * max_sleep
+                sleep_seconds = random.uniform(0, 1 << retry)
                 logger.info(f"Sleeping {sleep_seconds:.2f} seconds and then retrying...")
                 time.sleep(sleep_seconds)
                 error = None